@@ -124,6 +124,10 @@ def create_app(config_class=Config):
         from app.models import Lab
         if Lab.query.count() == 0:        # seed only once
             Lab.get_predefined_labs()
+
+        # Lab lookups are served from memory from here on
+        from app.main import lab_registry
+        lab_registry.load()
             
         # Ensure admin user exists
         if not User.query.filter_by(
@@ -1,6 +1,7 @@
 import click
 from flask import current_app
 from flask.cli import with_appcontext
+from sqlalchemy import bindparam, select, update
 from app.extensions import db
 from app.models import User, Lab, Product, TransferLog, UserLog
 
@@ -10,6 +11,8 @@ def init_cli(app):
     app.cli.add_command(create_admin_command)
     app.cli.add_command(convert_quantities_command)
     app.cli.add_command(update_lab_codes_command)
+    app.cli.add_command(backfill_categories_command)
+    app.cli.add_command(recompute_lab_counters_command)
 
 @click.command("init-db")
 @with_appcontext
@@ -123,4 +126,84 @@ def update_lab_codes_command():
         click.echo("Lab codes updated successfully!")
     except Exception as e:
         db.session.rollback()
-        click.echo(f"Error updating lab codes: {str(e)}", err=True)
\ No newline at end of file
+        click.echo(f"Error updating lab codes: {str(e)}", err=True)
+
+@click.command("backfill-categories")
+@click.option('--batch-size', default=1000, help='Products updated per commit')
+@click.option('--all', 'recompute_all', is_flag=True,
+              help='Recompute categories that are already set')
+@with_appcontext
+def backfill_categories_command(batch_size, recompute_all):
+    """Fill the stored category of existing products"""
+    table = Product.__table__
+    query = select(table.c.id, table.c.name).order_by(table.c.id)\
+        .limit(batch_size)
+    if not recompute_all:
+        query = query.where(table.c.category.is_(None))
+    # Plain table update: a derived column must not bump version_id
+    stmt = update(table).where(table.c.id == bindparam('product_id'))\
+        .values(category=bindparam('new_category'))
+
+    last_id = 0
+    updated = 0
+    while True:
+        rows = db.session.execute(query.where(table.c.id > last_id)).all()
+        if not rows:
+            break
+        try:
+            db.session.execute(stmt, [
+                {
+                    'product_id': row.id,
+                    'new_category': Product.get_category_from_name(row.name)
+                }
+                for row in rows
+            ])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            click.echo(f"Error backfilling categories: {str(e)}", err=True)
+            return
+        last_id = rows[-1].id
+        updated += len(rows)
+        click.echo(f"Updated {updated} products")
+
+    click.echo(f"Categories backfilled for {updated} products")
+
+@click.command("recompute-lab-counters")
+@with_appcontext
+def recompute_lab_counters_command():
+    """Recompute the product counters of every lab from scratch"""
+    totals = {
+        row[0]: row[1:]
+        for row in db.session.execute(
+            select(Product.lab_id, *Product.stock_counter_expressions())
+            .group_by(Product.lab_id)
+        )
+    }
+    table = Lab.__table__
+    # Bump the revision too, so pages showing stale counters revalidate
+    stmt = update(table).where(table.c.id == bindparam('lab_id')).values(
+        revision=table.c.revision + 1,
+        product_count=bindparam('new_products'),
+        total_units=bindparam('new_units'),
+        low_stock_count=bindparam('new_low'),
+        out_of_stock_count=bindparam('new_out')
+    )
+    lab_ids = db.session.execute(select(table.c.id)).scalars().all()
+    if not lab_ids:
+        click.echo("No labs to recompute")
+        return
+    try:
+        db.session.execute(stmt, [
+            dict(zip(
+                ('lab_id', 'new_products', 'new_units', 'new_low', 'new_out'),
+                (lab_id, *totals.get(lab_id, (0, 0, 0, 0)))
+            ))
+            for lab_id in lab_ids
+        ])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        click.echo(f"Error recomputing lab counters: {str(e)}", err=True)
+        return
+    click.echo(f"Counters recomputed for {len(lab_ids)} labs")
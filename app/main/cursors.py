@@ -0,0 +1,63 @@
+# app/main/cursors.py
+
+import base64
+import binascii
+import json
+from sqlalchemy import and_, literal, or_
+
+# Paged listings continue after the sort key of the last row of the
+# previous page (seek pagination) instead of skipping an OFFSET, so every
+# page is an index range scan however deep into the listing it is. The
+# key travels to the client as an opaque cursor.
+
+
+def encode_cursor(key):
+    """Return the opaque cursor of a JSON serializable key."""
+    return base64.urlsafe_b64encode(
+        json.dumps(key).encode('utf-8')
+    ).decode('ascii').rstrip('=')
+
+
+def parse_cursor(value, kind, length=None):
+    """Parse a cursor from encode_cursor() into its key.
+
+    Args:
+        value: The cursor
+        kind: Name of the listing, used in the error message
+        length: Number of values of a list key, or None for any key
+
+    Raises:
+        ValueError: If the cursor is malformed or its key is not a list
+            of ``length`` values
+    """
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded).decode('utf-8'))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError(f"Invalid {kind} cursor: {value}")
+    if length is not None and \
+            (not isinstance(key, list) or len(key) != length):
+        raise ValueError(f"Invalid {kind} cursor: {value}")
+    return key
+
+
+def seek(columns, values):
+    """Return the WHERE clause of rows after a key in sort order.
+
+    Written as ``a >= x AND (a > x OR (a = x AND <rest>))`` rather than a
+    flat OR, so the leading column bounds the range scan, with the
+    column directions mixed if need be.
+
+    Args:
+        columns: (column, descending) pairs of the sort key
+        values: Values of the key, one per column
+    """
+    column, descending = columns[0]
+    value = literal(values[0], column.type)
+    after = column < value if descending else column > value
+    if len(columns) == 1:
+        return after
+    return and_(
+        column <= value if descending else column >= value,
+        or_(after, and_(column == value, seek(columns[1:], values[1:])))
+    )
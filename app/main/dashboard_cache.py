@@ -0,0 +1,56 @@
+# app/main/dashboard_cache.py
+
+import threading
+import time
+from flask import current_app, has_app_context
+
+from app.main.dashboard_sections import location_sections
+from app.main.lab_changes import on_products_committed
+
+_lock = threading.Lock()
+
+
+def _state():
+    """Return the (sections, generations) dicts of the current app."""
+    return current_app.extensions.setdefault('dashboard_cache', ({}, {}))
+
+
+def get_location_sections(lab_id):
+    """Return the location sections of a lab, cached per process.
+
+    Entries are dropped when a commit touches a product of the lab, and
+    expire after ``DASHBOARD_CACHE_TTL`` seconds to pick up writes made
+    by other processes (e.g. CLI commands).
+
+    Args:
+        lab_id: ID of the lab
+
+    Returns:
+        list: Sections as returned by location_sections()
+    """
+    ttl = current_app.config.get('DASHBOARD_CACHE_TTL', 300)
+    cached, generations = _state()
+    with _lock:
+        entry = cached.get(lab_id)
+        generation = generations.get(lab_id, 0)
+    if entry is not None and time.monotonic() - entry[0] < ttl:
+        return entry[1]
+
+    sections = location_sections(lab_id)
+    with _lock:
+        # Skip caching if the lab changed while the sections were counted
+        if generations.get(lab_id, 0) == generation:
+            cached[lab_id] = (time.monotonic(), sections)
+    return sections
+
+
+@on_products_committed
+def invalidate(lab_ids):
+    """Drop the cached location sections of the given labs."""
+    if not has_app_context():
+        return
+    cached, generations = _state()
+    with _lock:
+        for lab_id in lab_ids:
+            cached.pop(lab_id, None)
+            generations[lab_id] = generations.get(lab_id, 0) + 1
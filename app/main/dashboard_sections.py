@@ -0,0 +1,200 @@
+# app/main/dashboard_sections.py
+
+from collections import namedtuple
+from flask import current_app
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.main.cursors import encode_cursor, parse_cursor, seek
+from app.models import Lab, Product
+
+# Fields of a product the dashboard renders
+DashboardProduct = namedtuple('DashboardProduct', [
+    'id', 'name', 'registry_number', 'quantity', 'unit',
+    'minimum_quantity', 'category'
+])
+
+# Counters of a lab shown on the all labs overview
+LabOverview = namedtuple('LabOverview', [
+    'id', 'code', 'name', 'product_count', 'total_units',
+    'low_stock_count', 'out_of_stock_count'
+])
+
+
+def lab_overview():
+    """Return the product counters of every lab, ordered by code.
+
+    Reads the counters kept on each lab row, so the cost grows with the
+    number of labs rather than the number of products.
+
+    Returns:
+        list: LabOverview records
+    """
+    stmt = select(
+        Lab.id,
+        Lab.code,
+        Lab.name,
+        Lab.product_count,
+        Lab.total_units,
+        Lab.low_stock_count,
+        Lab.out_of_stock_count
+    ).order_by(Lab.code)
+    return [LabOverview(*row) for row in db.session.execute(stmt)]
+
+
+def section_key(location_type, number, position):
+    """Return the URL key of a location section.
+
+    ``workspace``, ``cabinet-<number>-<position>``, or shorter cabinet
+    keys for cabinets stored without a number or position.
+    """
+    if location_type == 'workspace':
+        return 'workspace'
+    parts = [location_type]
+    if number is not None:
+        parts.append(str(number))
+    if position is not None:
+        parts.append(position)
+    return '-'.join(parts)
+
+
+def parse_section_key(key):
+    """Parse a section key into (location_type, number, position).
+
+    Raises:
+        ValueError: If the key does not name a location
+    """
+    if key == 'workspace':
+        return 'workspace', None, None
+    parts = key.split('-')
+    if parts[0] != 'cabinet' or len(parts) > 3:
+        raise ValueError(f"Invalid location section: {key}")
+    number = position = None
+    for part in parts[1:]:
+        if part.isdigit() and number is None and position is None:
+            number = int(part)
+        elif part in ('upper', 'lower') and position is None:
+            position = part
+        else:
+            raise ValueError(f"Invalid location section: {key}")
+    return 'cabinet', number, position
+
+
+def location_sections(lab_id):
+    """Return the location sections of a lab with their product counts.
+
+    One GROUP BY over the display index, in dashboard order.
+
+    Returns:
+        list: Dicts with ``key``, ``location_display`` and ``count``
+    """
+    stmt = select(
+        Product.location_type,
+        Product.location_number,
+        Product.location_position,
+        Product.location_display_expression(),
+        func.count(Product.id)
+    ).where(Product.lab_id == lab_id).group_by(
+        Product.location_type,
+        Product.location_number,
+        Product.location_position
+    ).order_by(*Product.display_order()[:3])
+    return [
+        {
+            'key': section_key(location_type, number, position),
+            'location_display': display,
+            'count': count
+        }
+        for location_type, number, position, display, count
+        in db.session.execute(stmt)
+    ]
+
+
+def encode_section_cursor(category, name, product_id):
+    """Return the opaque cursor continuing after a product.
+
+    Args:
+        category: Stored category of the product, None if not backfilled
+        name: Name of the product
+        product_id: ID of the product
+    """
+    return encode_cursor([category, name, product_id])
+
+
+def parse_section_cursor(value):
+    """Parse a cursor into its (category, name, id) key.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    return tuple(parse_cursor(value, 'section', 3))
+
+
+def section_page(lab_id, location, after=None, limit=None):
+    """Return one page of a location section in display order.
+
+    Pages continue after the (category, name, id) key of the previous
+    one, read from the display index. Products whose category has not
+    been backfilled yet come first: databases disagree on where NULLs
+    sort, so they are paged on their own, by name.
+
+    Args:
+        lab_id: ID of the lab
+        location: (location_type, number, position) of the section
+        after: Key from parse_section_cursor(), or None for the first page
+        limit: Page size, default ``DASHBOARD_SECTION_PAGE_SIZE``
+
+    Returns:
+        tuple: (list of DashboardProduct, cursor of the next page or None)
+    """
+    if limit is None:
+        limit = current_app.config.get('DASHBOARD_SECTION_PAGE_SIZE', 100)
+    location_type, number, position = location
+    stmt = select(
+        Product.id,
+        Product.name,
+        Product.registry_number,
+        Product.quantity,
+        Product.unit,
+        Product.minimum_quantity,
+        Product.category
+    ).where(
+        Product.lab_id == lab_id,
+        Product.location_type == location_type,
+        Product.location_number.is_(None) if number is None
+        else Product.location_number == number,
+        Product.location_position.is_(None) if position is None
+        else Product.location_position == position
+    )
+
+    rows = []
+    if after is None or after[0] is None:
+        uncategorized = stmt.where(Product.category.is_(None))\
+            .order_by(Product.name, Product.id).limit(limit + 1)
+        if after is not None:
+            uncategorized = uncategorized.where(seek(
+                [(Product.name, False), (Product.id, False)], after[1:]
+            ))
+            after = None
+        rows = db.session.execute(uncategorized).all()
+    if len(rows) <= limit:
+        categorized = stmt.where(Product.category.is_not(None))\
+            .order_by(Product.category, Product.name, Product.id)\
+            .limit(limit + 1 - len(rows))
+        if after is not None:
+            categorized = categorized.where(seek([
+                (Product.category, False), (Product.name, False),
+                (Product.id, False)
+            ], after))
+        rows += db.session.execute(categorized).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_section_cursor(last.category, last.name, last.id)
+    return [
+        DashboardProduct(*row[:6], row.category or
+                         Product.get_category_from_name(row.name))
+        for row in rows
+    ], next_cursor
@@ -0,0 +1,205 @@
+# app/main/export_cache.py
+
+import os
+import threading
+import time
+import uuid
+from flask import current_app, has_app_context
+from app.main import lab_registry
+from app.main.lab_changes import on_products_committed
+from app.main.revisions import lab_revision
+
+
+# Events of the exports currently being generated, keyed by cache path
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def _cache_directory():
+    directory = current_app.config.get('EXPORT_CACHE_DIR') or os.path.join(
+        current_app.instance_path, 'export_cache'
+    )
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _scope(lab_id):
+    return f"lab-{lab_id}" if lab_id else 'all'
+
+
+def inventory_version(lab=None):
+    """Return a token that changes whenever the exported inventory does.
+
+    Built from the lab revision (the sum of all revisions for the full
+    inventory), which every product write bumps, and the lab registry
+    version, which covers the lab names in the export. Unlike
+    aggregating the product table, this is a primary key lookup.
+
+    Args:
+        lab: Optional Lab to restrict the version to
+
+    Returns:
+        str: Version token, safe to use in file names
+    """
+    revision = lab_revision(lab.id if lab is not None else None)
+    return f"r{revision}-{lab_registry.version()[:8]}"
+
+
+def cache_path(lab, format, version):
+    """Return the cache file path for an export of the given state."""
+    scope = _scope(lab.id if lab else None)
+    return os.path.join(_cache_directory(), f"{scope}.{version}.{format}")
+
+
+def lookup(path):
+    """Return path if the export is cached, marking it recently used.
+
+    Recency is kept in the access time so the modification time, and
+    with it the ETag, only changes when the file is regenerated.
+    """
+    if not current_app.config.get('EXPORT_CACHE_ENABLED', True):
+        return None
+    try:
+        os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+    except OSError:
+        return None
+    return path
+
+
+def file_etag(path):
+    """Return the ETag of a cached export, or None if it is not cached.
+
+    Carries the inventory version the file was generated from, plus its
+    modification time and size, which change if it is regenerated.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    version = os.path.basename(path).split('.')[1]
+    return f"{version}-{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def claim(path):
+    """Wait for an identical export in flight, or claim its generation.
+
+    Concurrent requests for the same cache path are coalesced: the first
+    one generates the export, later ones block here until it is cached
+    and are then served the same file. If the generating request fails
+    or is abandoned, one of the waiting requests takes over. After
+    ``EXPORT_COALESCE_TIMEOUT`` seconds a waiting request stops waiting
+    and generates the export itself.
+
+    Args:
+        path: Cache file path from cache_path()
+
+    Returns:
+        threading.Event: Flight token to pass to store() and release()
+            when the caller has to generate the export, or None if it
+            has been cached in the meantime
+    """
+    if not current_app.config.get('EXPORT_CACHE_ENABLED', True):
+        return threading.Event()
+
+    deadline = time.monotonic() + current_app.config.get(
+        'EXPORT_COALESCE_TIMEOUT', 300
+    )
+    while True:
+        with _in_flight_lock:
+            flight = _in_flight.get(path)
+            if flight is None:
+                flight = _in_flight[path] = threading.Event()
+                return flight
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not flight.wait(remaining):
+            # Give up on the slow flight without taking it over
+            return threading.Event()
+        if lookup(path):
+            return None
+
+
+def release(path, flight):
+    """Wake the requests waiting on a flight; safe to call repeatedly."""
+    if flight is None:
+        return
+    with _in_flight_lock:
+        if _in_flight.get(path) is flight:
+            del _in_flight[path]
+    flight.set()
+
+
+def store(path, chunks, flight=None):
+    """Pass export chunks through while writing them to the cache.
+
+    The file only becomes visible once every chunk has been written, so
+    a failed or abandoned export never leaves a partial cache entry.
+
+    Args:
+        path: Cache file path from cache_path()
+        chunks: Iterable of bytes
+        flight: Token from claim(), released once the export is cached
+            or has failed
+
+    Yields:
+        bytes: The same chunks
+    """
+    if not current_app.config.get('EXPORT_CACHE_ENABLED', True):
+        yield from chunks
+        return
+
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    completed = False
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp_path, path)
+        completed = True
+    finally:
+        if not completed and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        release(path, flight)
+    _evict(current_app.config.get('EXPORT_CACHE_MAX_BYTES', 256 * 1024 ** 2))
+
+
+def _evict(max_bytes):
+    """Delete least recently used cache files until under max_bytes."""
+    directory = _cache_directory()
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith('.tmp'):
+            continue
+        try:
+            stat = os.stat(os.path.join(directory, name))
+        except OSError:
+            continue
+        entries.append((stat.st_atime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+        total -= size
+
+
+def invalidate(lab_ids):
+    """Drop cached exports of the given labs and of the full inventory."""
+    directory = _cache_directory()
+    prefixes = tuple(f"{_scope(lab_id)}." for lab_id in lab_ids) + ('all.',)
+    for name in os.listdir(directory):
+        if name.startswith(prefixes) and not name.endswith('.tmp'):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+@on_products_committed
+def _invalidate_after_commit(lab_ids):
+    if has_app_context():
+        invalidate(lab_ids)
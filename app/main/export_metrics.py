@@ -0,0 +1,97 @@
+# app/main/export_metrics.py
+
+import threading
+import time
+import tracemalloc
+from flask import current_app, has_app_context
+
+_tracing_lock = threading.Lock()
+_tracing_exports = 0
+# Whether the first export started tracing, rather than finding it on
+_started_tracing = False
+
+
+def _start_tracing():
+    global _tracing_exports, _started_tracing
+    with _tracing_lock:
+        if _tracing_exports == 0:
+            _started_tracing = not tracemalloc.is_tracing()
+            if _started_tracing:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+        _tracing_exports += 1
+
+
+def _stop_tracing():
+    """Return the traced peak and stop tracing after the last export.
+
+    Tracing started by someone else, e.g. a profiler, is left running.
+    """
+    global _tracing_exports
+    with _tracing_lock:
+        _, peak = tracemalloc.get_traced_memory()
+        _tracing_exports -= 1
+        if _tracing_exports == 0 and _started_tracing:
+            tracemalloc.stop()
+        return peak
+
+
+class ExportMetrics:
+    """Row count, size, wall time and peak memory of one export.
+
+    Wrap the row iterator with ``count_rows`` and the chunk iterator
+    with ``track``; the summary is logged once the chunks are exhausted
+    or the stream is closed.
+
+    Peak memory is measured with tracemalloc, which traces the whole
+    process, so exports running at the same time share one peak.
+    Tracing is controlled by ``EXPORT_TRACE_MEMORY``.
+    """
+
+    def __init__(self, format, scope):
+        self.format = format
+        self.scope = scope
+        self.rows = 0
+        self.bytes = 0
+        self.elapsed = None
+        self.peak_memory = None
+        self.completed = False
+
+    def count_rows(self, rows):
+        for row in rows:
+            self.rows += 1
+            yield row
+
+    def track(self, chunks):
+        """Pass chunks through while measuring the export."""
+        trace = has_app_context() and current_app.config.get(
+            'EXPORT_TRACE_MEMORY', False
+        )
+        if trace:
+            _start_tracing()
+        started = time.perf_counter()
+        try:
+            for chunk in chunks:
+                self.bytes += len(chunk)
+                yield chunk
+            self.completed = True
+        finally:
+            self.elapsed = time.perf_counter() - started
+            if trace:
+                self.peak_memory = _stop_tracing()
+            self.log()
+
+    def log(self):
+        if not has_app_context():
+            return
+        peak = (
+            f"{self.peak_memory / 1024 ** 2:.1f} MiB"
+            if self.peak_memory is not None else 'n/a'
+        )
+        current_app.logger.info(
+            f"Export {self.format} ({self.scope}) "
+            f"{'completed' if self.completed else 'aborted'}: "
+            f"{self.rows} rows, {self.bytes} bytes, "
+            f"{self.elapsed:.3f}s, peak memory {peak}"
+        )
@@ -0,0 +1,860 @@
+# app/main/exports.py
+
+import csv
+import hashlib
+import io
+import json
+import queue
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import groupby, islice
+from operator import itemgetter
+from xml.sax.saxutils import escape
+from flask import current_app, has_app_context
+from sqlalchemy import (
+    func, literal, literal_column, null, select, union_all
+)
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xlsxwriter
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import (
+    SimpleDocTemplate, LongTable, TableStyle, Paragraph, PageBreak, Flowable
+)
+
+from app.extensions import db
+from app.main.cursors import encode_cursor, parse_cursor
+from app.main.export_metrics import ExportMetrics
+from app.models import Product, ProductTombstone, Lab
+from app.utils import format_timestamp
+
+
+LAB_COLUMNS = [
+    'Name', 'Registry Number', 'Quantity', 'Unit',
+    'Minimum Quantity', 'Location', 'Notes'
+]
+ALL_LABS_COLUMNS = ['Lab'] + LAB_COLUMNS
+
+# Formats that can carry delta exports (change type and tombstones)
+DELTA_FORMATS = ('xlsx', 'csv', 'ndjson', 'parquet', 'arrow')
+
+XLSX_MIMETYPE = (
+    "application/vnd.openxmlformats-officedocument"
+    ".spreadsheetml.sheet"
+)
+
+# Rows per worksheet, including the header row
+XLSX_MAX_ROWS = 1048576
+
+CSV_MIMETYPE = 'text/csv'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+# Typed columns of the columnar formats; everything else is a string
+ARROW_COLUMN_TYPES = {
+    'Quantity': pa.int32(),
+    'Minimum Quantity': pa.int32(),
+}
+PARQUET_ROW_GROUP_ROWS = 64 * 1024
+
+_STREAM_DONE = object()
+
+
+def iter_export_rows(lab=None):
+    """Yield export rows as tuples from a single joined query.
+
+    Only the exported columns are selected, with the lab label and the
+    location display string computed in SQL, so no ORM objects are
+    built. Rows are read through a server-side cursor in batches of
+    ``EXPORT_BATCH_SIZE`` so the full inventory is never held in memory.
+
+    Args:
+        lab: Optional Lab to restrict the export to; all labs if None
+
+    Yields:
+        tuple: Values in LAB_COLUMNS order, or ALL_LABS_COLUMNS order
+            when exporting all labs
+    """
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    columns = [
+        Product.name,
+        Product.registry_number,
+        Product.quantity,
+        Product.unit,
+        Product.minimum_quantity,
+        Product.location_display_expression(),
+        func.coalesce(Product.notes, '')
+    ]
+    if lab is None:
+        columns.insert(
+            0, Lab.code + ' - ' + func.coalesce(Lab.description, '')
+        )
+
+    stmt = select(*columns)\
+        .join(Lab, Product.lab_id == Lab.id)\
+        .order_by(Product.lab_id, Product.id)\
+        .execution_options(yield_per=batch_size)
+    if lab is not None:
+        stmt = stmt.where(Product.lab_id == lab.id)
+
+    for row in db.session.execute(stmt):
+        yield tuple(row)
+
+
+def delta_columns(lab=None):
+    """Return the column names of a delta export."""
+    columns = LAB_COLUMNS if lab is not None else ALL_LABS_COLUMNS
+    return ['Change'] + columns + ['Changed At']
+
+
+def encode_export_cursor(timestamp):
+    """Return the opaque revision token for a UTC timestamp."""
+    return encode_cursor(timestamp.isoformat())
+
+
+def parse_export_cursor(value):
+    """Parse a ``since`` value into a naive UTC datetime.
+
+    Accepts either an ISO 8601 timestamp or a token returned by
+    encode_export_cursor().
+
+    Raises:
+        ValueError: If the value is neither
+    """
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        decoded = parse_cursor(value, 'export')
+        try:
+            timestamp = datetime.fromisoformat(decoded)
+        except (ValueError, TypeError):
+            raise ValueError(f"Invalid export cursor: {value}")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def next_export_cursor():
+    """Return the cursor a client should pass as ``since`` next time.
+
+    The cursor is moved back by ``EXPORT_DELTA_OVERLAP`` seconds so rows
+    written by transactions still in flight are not skipped; clients
+    receive those rows twice and apply them as idempotent upserts.
+    """
+    overlap = current_app.config.get('EXPORT_DELTA_OVERLAP', 60)
+    return encode_export_cursor(
+        datetime.utcnow() - timedelta(seconds=overlap)
+    )
+
+
+def iter_delta_rows(since, lab=None):
+    """Yield products changed after since, and tombstones of removed ones.
+
+    Upserts and tombstones come from one UNION ALL query over the
+    ``updated_at`` and ``deleted_at`` indexes, ordered by change time so
+    a product deleted and re-created is applied in the right order.
+
+    Args:
+        since: Naive UTC datetime; only later changes are exported
+        lab: Optional Lab to restrict the export to; all labs if None
+
+    Yields:
+        tuple: Values in delta_columns() order; 'Change' is 'upsert' or
+            'delete' and tombstones only carry the name and registry
+            number
+    """
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    lab_label = Lab.code + ' - ' + func.coalesce(Lab.description, '')
+
+    upserts = [
+        literal('upsert'),
+        Product.name,
+        Product.registry_number,
+        Product.quantity,
+        Product.unit,
+        Product.minimum_quantity,
+        Product.location_display_expression(),
+        func.coalesce(Product.notes, ''),
+        Product.updated_at.label('changed_at')
+    ]
+    deletes = [
+        literal('delete'),
+        ProductTombstone.name,
+        ProductTombstone.registry_number,
+        null(),
+        null(),
+        null(),
+        null(),
+        null(),
+        ProductTombstone.deleted_at.label('changed_at')
+    ]
+    if lab is None:
+        upserts.insert(1, lab_label)
+        deletes.insert(1, lab_label)
+
+    upserts = select(*upserts)\
+        .join(Lab, Product.lab_id == Lab.id)\
+        .where(Product.updated_at > since)
+    deletes = select(*deletes)\
+        .join(Lab, ProductTombstone.lab_id == Lab.id)\
+        .where(ProductTombstone.deleted_at > since)
+    if lab is not None:
+        upserts = upserts.where(Product.lab_id == lab.id)
+        deletes = deletes.where(ProductTombstone.lab_id == lab.id)
+
+    stmt = union_all(upserts, deletes)\
+        .order_by(literal_column('changed_at'))\
+        .execution_options(yield_per=batch_size)
+
+    for row in db.session.execute(stmt):
+        yield tuple(row[:-1]) + (row[-1].isoformat(),)
+
+
+class ChunkPipe:
+    """Write-only file object that hands written bytes to a consumer.
+
+    The producer (e.g. ``Workbook.close``) runs in a worker thread and
+    writes into a bounded queue; ``stream`` yields the buffered chunks
+    so finished parts reach the client while the rest is still being
+    written.
+    """
+
+    def __init__(self, chunk_size=64 * 1024, max_chunks=8):
+        self._queue = queue.Queue(max_chunks)
+        self._buffer = bytearray()
+        self._chunk_size = chunk_size
+        self._cancelled = False
+
+    def write(self, data):
+        if self._cancelled:
+            raise OSError("Export stream was closed by the client")
+        self._buffer += data
+        if len(self._buffer) >= self._chunk_size:
+            self._queue.put(bytes(self._buffer))
+            self._buffer.clear()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def stream(self, producer):
+        """Run producer in a worker thread and yield what it writes.
+
+        Args:
+            producer: Callable that writes the file into this pipe
+
+        Yields:
+            bytes: File chunks in write order
+        """
+        errors = []
+
+        def run():
+            try:
+                producer()
+                if self._buffer:
+                    self._queue.put(bytes(self._buffer))
+                    self._buffer.clear()
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                self._queue.put(_STREAM_DONE)
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        try:
+            while True:
+                chunk = self._queue.get()
+                if chunk is _STREAM_DONE:
+                    break
+                yield chunk
+        finally:
+            # Unblock a producer still waiting on a full queue
+            self._cancelled = True
+            while worker.is_alive():
+                try:
+                    self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        if errors:
+            raise errors[0]
+
+
+def generate_excel(rows, columns, sheet_name='Lab Inventory'):
+    """Generate Excel file as a stream.
+
+    Rows are written through xlsxwriter's constant_memory mode, so each
+    row is flushed to disk as soon as it is complete. Column widths are
+    tracked while writing instead of in a second pass over the data.
+    Rows beyond the worksheet limit continue on additional sheets.
+
+    Args:
+        rows: Iterable of export row tuples
+        columns: Column names to export, in order
+        sheet_name: Name of the (first) worksheet
+
+    Yields:
+        bytes: Excel file chunks
+    """
+    pipe = ChunkPipe()
+    workbook = xlsxwriter.Workbook(pipe, {'constant_memory': True})
+    header_format = workbook.add_format({
+        'bold': True,
+        'bg_color': '#4F81BD',
+        'font_color': 'white',
+        'border': 1
+    })
+
+    def add_sheet(number):
+        name = sheet_name if number == 1 else f"{sheet_name} ({number})"
+        worksheet = workbook.add_worksheet(name)
+        worksheet.write_row(0, 0, columns, header_format)
+        return worksheet, [len(column) for column in columns]
+
+    def set_widths(worksheet, widths):
+        for col_num, width in enumerate(widths):
+            worksheet.set_column(col_num, col_num, width + 2)
+
+    sheets = 1
+    worksheet, widths = add_sheet(sheets)
+    row_num = 0
+    for row in rows:
+        row_num += 1
+        if row_num == XLSX_MAX_ROWS:
+            set_widths(worksheet, widths)
+            sheets += 1
+            worksheet, widths = add_sheet(sheets)
+            row_num = 1
+        worksheet.write_row(row_num, 0, row)
+        for col_num, value in enumerate(row):
+            widths[col_num] = max(widths[col_num], len(str(value)))
+    set_widths(worksheet, widths)
+
+    yield from pipe.stream(workbook.close)
+
+
+def _batched(rows):
+    """Split a row iterator into lists of ``EXPORT_BATCH_SIZE`` rows."""
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def generate_csv(rows, columns):
+    """Generate CSV file as a stream.
+
+    The header is sent immediately and every batch of rows is encoded
+    into a single chunk, so memory stays bounded by the batch size.
+
+    Args:
+        rows: Iterable of export row tuples
+        columns: Column names to export, in order
+
+    Yields:
+        bytes: UTF-8 encoded CSV chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode('utf-8')
+
+    for batch in _batched(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def generate_ndjson(rows, columns):
+    """Generate newline-delimited JSON as a stream.
+
+    Args:
+        rows: Iterable of export row tuples
+        columns: Column names to export, in order
+
+    Yields:
+        bytes: UTF-8 encoded chunks with one JSON object per line
+    """
+    for batch in _batched(rows):
+        yield ''.join(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+            for row in batch
+        ).encode('utf-8')
+
+
+def _arrow_schema(columns):
+    return pa.schema([
+        (column, ARROW_COLUMN_TYPES.get(column, pa.string()))
+        for column in columns
+    ])
+
+
+def _record_batches(rows, schema, batch_rows):
+    """Transpose row tuples into typed Arrow record batches."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_rows))
+        if not batch:
+            return
+        yield pa.RecordBatch.from_arrays(
+            [
+                pa.array(values, type=field.type)
+                for values, field in zip(zip(*batch), schema)
+            ],
+            schema=schema
+        )
+
+
+def _drain(buffer):
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def generate_parquet(rows, columns):
+    """Generate a Parquet file as a stream.
+
+    Rows are transposed into typed columns and written one row group of
+    ``PARQUET_ROW_GROUP_ROWS`` rows at a time; each finished row group
+    is sent to the client before the next one is read.
+
+    Args:
+        rows: Iterable of export row tuples
+        columns: Column names to export, in order
+
+    Yields:
+        bytes: Parquet file chunks
+    """
+    schema = _arrow_schema(columns)
+    buffer = io.BytesIO()
+    with pq.ParquetWriter(pa.PythonFile(buffer, mode='w'), schema) as writer:
+        for batch in _record_batches(rows, schema, PARQUET_ROW_GROUP_ROWS):
+            writer.write_batch(batch)
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def generate_arrow(rows, columns):
+    """Generate an Arrow IPC stream.
+
+    Args:
+        rows: Iterable of export row tuples
+        columns: Column names to export, in order
+
+    Yields:
+        bytes: Arrow IPC stream chunks, one per row batch
+    """
+    batch_rows = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    schema = _arrow_schema(columns)
+    buffer = io.BytesIO()
+    with pa.ipc.new_stream(pa.PythonFile(buffer, mode='w'), schema) as writer:
+        for batch in _record_batches(rows, schema, batch_rows):
+            writer.write_batch(batch)
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+class _FlowableFeed(Flowable):
+    """Placeholder that expands into flowables pulled from an iterator."""
+
+    def __init__(self, flowables):
+        super().__init__()
+        self.flowables = iter(flowables)
+
+    def wrap(self, availWidth, availHeight):
+        return (0, 0)
+
+    def draw(self):
+        pass
+
+
+class _LazyDocTemplate(SimpleDocTemplate):
+    """Doc template that builds flowables on demand during layout.
+
+    Only the flowables of the page being laid out are alive at any time,
+    so memory and layout cost do not depend on the total row count.
+    """
+
+    def filterFlowables(self, flowables):
+        feed = flowables[0]
+        if isinstance(feed, _FlowableFeed):
+            flowable = next(feed.flowables, None)
+            if flowable is None:
+                flowables[0] = None
+            else:
+                flowables.insert(0, flowable)
+
+
+PDF_HEADERS = [
+    'Name', 'Registry #', 'Quantity', 'Unit',
+    'Min Qty', 'Location', 'Notes'
+]
+PDF_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+])
+
+
+@lru_cache(maxsize=None)
+def _pdf_row_metrics():
+    """Return (header height, line height, row padding) of report tables.
+
+    Values are plain strings, which never wrap, so a row is as tall as
+    its number of lines.
+    """
+    def height(rows):
+        return LongTable(
+            [PDF_HEADERS] + rows, style=PDF_TABLE_STYLE
+        ).wrap(0, 0)[1]
+
+    blank = [''] * (len(PDF_HEADERS) - 1)
+    header = height([])
+    one_line = height([['x'] + blank]) - header
+    two_lines = height([['x\nx'] + blank]) - header
+    return header, two_lines - one_line, 2 * one_line - two_lines
+
+
+class _PdfTableFeed(Flowable):
+    """Rows laid out as one LongTable per page, under one header row.
+
+    Claims more than the space left so the frame always splits it; each
+    split takes the rows that fit in that space and carries on after a
+    page break. Only the rows of the page being laid out are read from
+    the iterator.
+    """
+
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = iter(rows)
+        self.pending = []
+        self.at_top = False
+
+    def _next_row(self):
+        if self.pending:
+            return self.pending.pop()
+        row = next(self.rows, None)
+        return None if row is None else [str(value) for value in row]
+
+    def wrap(self, availWidth, availHeight):
+        return availWidth, availHeight + 1
+
+    def split(self, availWidth, availHeight):
+        header, line_height, padding = _pdf_row_metrics()
+        chunk = []
+        height = header
+        while True:
+            row = self._next_row()
+            if row is None:
+                break
+            lines = max(value.count('\n') for value in row) + 1
+            height += padding + lines * line_height
+            # A row taller than a whole page still gets a page of its own
+            if height > availHeight and (chunk or not self.at_top):
+                self.pending.append(row)
+                break
+            chunk.append(row)
+        if not chunk and self.pending:
+            # Not even one row fits below the content above
+            self.at_top = True
+            return []
+        self.at_top = True
+
+        table = LongTable(
+            [PDF_HEADERS] + chunk, repeatRows=1, style=PDF_TABLE_STYLE
+        )
+        row = self._next_row()
+        if row is None:
+            return [table]
+        self.pending.append(row)
+        return [table, PageBreak(), self]
+
+    def draw(self):
+        pass
+
+
+def _pdf_flowables(rows, lab_code, styles):
+    """Yield report flowables, one section per lab for full reports."""
+    title_text = (
+        f"Lab Inventory Report - {lab_code}"
+        if lab_code
+        else "Full Inventory Report"
+    )
+    timestamp = format_timestamp(datetime.utcnow())
+    yield Paragraph(title_text, styles['Title'])
+    yield Paragraph(
+        f"Generated on: {timestamp.strftime('%Y-%m-%d %H:%M')}",
+        styles['Normal']
+    )
+
+    if lab_code:
+        yield _PdfTableFeed(rows)
+        return
+
+    for index, (lab, lab_rows) in enumerate(groupby(rows, key=itemgetter(0))):
+        if index:
+            yield PageBreak()
+        yield Paragraph(lab, styles['Heading2'])
+        yield _PdfTableFeed(row[1:] for row in lab_rows)
+
+
+def generate_pdf(rows, lab_code=None):
+    """Generate PDF file as a stream.
+
+    Rows are laid out in one LongTable per page, sized to the space
+    left on it and created lazily while the document is built. Full
+    reports start a new section for every lab.
+
+    Args:
+        rows: Iterable of export row tuples
+        lab_code: Optional lab code for title
+
+    Returns:
+        SpooledTemporaryFile: PDF file, rewound
+    """
+    buffer = _spooled_file()
+
+    doc = _LazyDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=72
+    )
+    styles = getSampleStyleSheet()
+    doc.build([_FlowableFeed(_pdf_flowables(rows, lab_code, styles))])
+    buffer.seek(0)
+    return buffer
+
+
+DOCX_BATCH_ROWS = 500
+
+
+def _docx_run_xml(text):
+    """Return the run XML for a cell value, as python-docx would write it."""
+    text = escape(str(text))
+    text = text.replace('\t', '</w:t><w:tab/><w:t xml:space="preserve">')
+    text = text.replace('\n', '</w:t><w:br/><w:t xml:space="preserve">')
+    return f'<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
+
+
+def _docx_table_rows(rows, widths):
+    """Yield batches of table rows parsed from one XML string per batch."""
+    rows = iter(rows)
+    cell_xml = [
+        f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>'
+        '<w:p>{}</w:p></w:tc>'
+        for width in widths
+    ]
+    while True:
+        batch = list(islice(rows, DOCX_BATCH_ROWS))
+        if not batch:
+            return
+        parts = []
+        for row in batch:
+            parts.append('<w:tr>')
+            parts.extend(
+                cell.format(_docx_run_xml(value))
+                for cell, value in zip(cell_xml, row)
+            )
+            parts.append('</w:tr>')
+        yield parse_xml(
+            f'<w:tbl {nsdecls("w")}>{"".join(parts)}</w:tbl>'
+        )
+
+
+def generate_word(rows, lab_code=None):
+    """Generate Word document as a stream.
+
+    Table rows are written as raw WordprocessingML in batches instead
+    of through ``table.add_row().cells``, which rescans the whole table
+    for every row and makes large exports quadratic.
+
+    Args:
+        rows: Iterable of export row tuples
+        lab_code: Optional lab code for title
+
+    Returns:
+        SpooledTemporaryFile: Word document, rewound
+    """
+    doc = Document()
+    title_text = (
+        f"Lab Inventory Report - {lab_code}"
+        if lab_code
+        else "Full Inventory Report"
+    )
+    doc.add_heading(title_text, 0)
+
+    timestamp = format_timestamp(datetime.utcnow())
+    doc.add_paragraph(
+        f"Generated on: {timestamp.strftime('%Y-%m-%d %H:%M')}"
+    )
+
+    headers = [
+        'Name', 'Registry #', 'Quantity', 'Unit',
+        'Min Qty', 'Location', 'Notes'
+    ]
+    if not lab_code:
+        headers.insert(0, 'Lab')
+
+    table = doc.add_table(rows=1, cols=len(headers))
+    table.style = 'Table Grid'
+    header_cells = table.rows[0].cells
+    for i, header in enumerate(headers):
+        header_cells[i].text = header
+
+    tbl = table._tbl
+    widths = [grid_col.w for grid_col in tbl.tblGrid.gridCol_lst]
+    for batch in _docx_table_rows(rows, widths):
+        tbl.extend(list(batch))
+
+    buffer = _spooled_file()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+DOCX_MIMETYPE = (
+    "application/vnd.openxmlformats-officedocument"
+    ".wordprocessingml.document"
+)
+
+EXPORT_MIMETYPES = {
+    'xlsx': XLSX_MIMETYPE,
+    'pdf': 'application/pdf',
+    'docx': DOCX_MIMETYPE,
+    'csv': CSV_MIMETYPE,
+    'ndjson': NDJSON_MIMETYPE,
+    'parquet': PARQUET_MIMETYPE,
+    'arrow': ARROW_MIMETYPE,
+}
+
+# Formats rendered completely before their first byte is available;
+# these are spooled and sent with a known length instead of streamed
+SPOOLED_FORMATS = ('pdf', 'docx')
+
+
+def iter_export(format, rows, lab_code=None, columns=None):
+    """Render an export in the given format as a stream of chunks.
+
+    The row count, size, wall time and peak memory of every export are
+    logged (see ExportMetrics).
+
+    Args:
+        format: One of EXPORT_MIMETYPES
+        rows: Iterable of export row tuples
+        lab_code: Lab code for single-lab exports; None for all labs
+        columns: Column names for the tabular formats; defaults to the
+            lab or all-labs columns
+
+    Yields:
+        bytes: File chunks
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    metrics = ExportMetrics(format, lab_code or 'all')
+    yield from metrics.track(
+        _render_export(format, metrics.count_rows(rows), lab_code, columns)
+    )
+
+
+def _render_export(format, rows, lab_code, columns):
+    if columns is None:
+        columns = LAB_COLUMNS if lab_code else ALL_LABS_COLUMNS
+    if format == 'xlsx':
+        yield from generate_excel(rows, columns)
+    elif format == 'csv':
+        yield from generate_csv(rows, columns)
+    elif format == 'ndjson':
+        yield from generate_ndjson(rows, columns)
+    elif format == 'parquet':
+        yield from generate_parquet(rows, columns)
+    elif format == 'arrow':
+        yield from generate_arrow(rows, columns)
+    elif format == 'pdf':
+        yield from _read_chunks(generate_pdf(rows, lab_code))
+    elif format == 'docx':
+        yield from _read_chunks(generate_word(rows, lab_code))
+    else:
+        raise ValueError(f"Unsupported export format: {format}")
+
+
+def _spooled_file():
+    """Return a temporary file kept in memory up to the spool threshold."""
+    max_size = 8 * 1024 * 1024
+    if has_app_context():
+        max_size = current_app.config.get('EXPORT_SPOOL_MAX_MEMORY', max_size)
+    return tempfile.SpooledTemporaryFile(max_size=max_size)
+
+
+def spool_export(chunks):
+    """Write export chunks to a spooled temporary file.
+
+    The file stays in memory up to ``EXPORT_SPOOL_MAX_MEMORY`` bytes and
+    moves to disk beyond that, so large exports do not sit in worker
+    RAM and can be served with a known length (Range requests, sendfile).
+
+    Args:
+        chunks: Iterable of bytes
+
+    Returns:
+        tuple: (file rewound to the start, size in bytes, SHA-1 hex
+            digest of the content for use as a strong ETag)
+    """
+    spool = _spooled_file()
+    digest = hashlib.sha1()
+    for chunk in chunks:
+        spool.write(chunk)
+        digest.update(chunk)
+    size = spool.tell()
+    spool.seek(0)
+    return spool, size, digest.hexdigest()
+
+
+def _read_chunks(buffer, chunk_size=64 * 1024):
+    while True:
+        chunk = buffer.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_export(fileobj, format, rows, lab_code=None):
+    """Render an export in the given format into a binary file object.
+
+    Args:
+        fileobj: Writable binary file object
+        format: One of EXPORT_MIMETYPES
+        rows: Iterable of export row tuples
+        lab_code: Lab code for single-lab exports; None for all labs
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    for chunk in iter_export(format, rows, lab_code):
+        fileobj.write(chunk)
@@ -7,7 +7,13 @@ from wtforms import (
     SubmitField
 )
 from wtforms.validators import DataRequired, NumberRange, ValidationError
-from app.models import Lab
+from app.main import lab_registry
+
+UNIT_CHOICES = [
+    ('Adet', 'Adet'),
+    ('Paket', 'Paket'),
+    ('Kutu', 'Kutu')
+]
 
 class ProductForm(FlaskForm):
     """
@@ -20,11 +26,8 @@ class ProductForm(FlaskForm):
         DataRequired(),
         NumberRange(min=0, message="Quantity must be 0 or greater")
     ])
-    unit = SelectField('Unit', choices=[
-        ('Adet', 'Adet'),
-        ('Paket', 'Paket'),
-        ('Kutu', 'Kutu')
-    ], validators=[DataRequired()])
+    unit = SelectField('Unit', choices=UNIT_CHOICES,
+                       validators=[DataRequired()])
     minimum_quantity = IntegerField('Minimum Quantity', validators=[
         DataRequired(),
         NumberRange(min=0, message="Minimum quantity must be 0 or greater")
@@ -39,11 +42,7 @@ class ProductForm(FlaskForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # Always populate labs list from predefined labs
-        labs = Lab.get_predefined_labs()
-        self.lab_id.choices = [
-            (lab.id, f"{lab.code} - {lab.name}") for lab in labs
-        ]
+        self.lab_id.choices = lab_registry.choices()
 
         # If form is being submitted or loaded with obj, provide selections
         if self.lab_id.data:
@@ -58,7 +57,7 @@ class ProductForm(FlaskForm):
         """
         Returns location choices (workspace / cabinet) based on selected lab.
         """
-        lab = Lab.query.get(lab_id)
+        lab = lab_registry.get(lab_id)
         if not lab:
             return []
 
@@ -110,7 +109,7 @@ class TransferForm(FlaskForm):
 
         # ---------- SOURCE LAB (yeni) ----------
         if source_lab_id is not None:
-            src_lab = Lab.query.get(source_lab_id)
+            src_lab = lab_registry.get(source_lab_id)
             label = f"{src_lab.code} - {src_lab.name}" if src_lab else "Current Lab"
             self.source_lab_id.choices = [(source_lab_id, label)]
             self.source_lab_id.data = source_lab_id
@@ -128,11 +127,7 @@ class TransferForm(FlaskForm):
             self.product_id.choices = [(-1, "--- unknown product ---")]
 
         # ----------- SOURCE / DEST LAB -----------
-        q = Lab.query
-        if source_lab_id is not None:
-            q = q.filter(Lab.id != source_lab_id)
-
-        dest_choices = [(l.id, f"{l.code} - {l.name}") for l in q.all()] \
+        dest_choices = lab_registry.choices(exclude_id=source_lab_id) \
                        or [(-1, "--- no other labs ---")]
         self.destination_lab_id.choices = dest_choices
 
@@ -0,0 +1,131 @@
+# app/main/inventory_grid.py
+
+from flask import current_app
+from sqlalchemy import and_, func, select
+
+from app.extensions import db
+from app.main.cursors import encode_cursor, parse_cursor, seek
+from app.models import Lab, Product
+from app.models.product import ProductRecord
+
+# Sort keys of the grid: (column, descending) pairs, each ending with
+# the id so keys are unique. Every key is served by an index.
+GRID_SORTS = {
+    'name': ((Product.name, False), (Product.id, False)),
+    'registry_number': ((Product.registry_number, False), (Product.id, False)),
+    'quantity': ((Product.quantity, False), (Product.id, False)),
+    # By lab id, the order labs were seeded in, then name
+    'lab': (
+        (Product.lab_id, False), (Product.name, False), (Product.id, False)
+    ),
+    # Out, then low stock before ok, each by quantity
+    'stock_level': (
+        (Product.low_stock, True), (Product.quantity, False),
+        (Product.id, False)
+    ),
+}
+
+GRID_STOCK_FILTERS = {
+    'ok': Product.low_stock.is_(False),
+    'low': and_(Product.low_stock.is_(True), Product.quantity > 0),
+    'out': Product.quantity <= 0,
+}
+
+
+def _sort_key(sort, record):
+    """Return the values of a sort key for a ProductRecord."""
+    if sort == 'lab':
+        return [record.lab_id, record.name, record.id]
+    if sort == 'stock_level':
+        return [record.stock_level != 'ok', record.quantity, record.id]
+    return [getattr(record, sort), record.id]
+
+
+def encode_grid_cursor(sort, direction, record):
+    """Return the opaque cursor continuing after a ProductRecord."""
+    return encode_cursor([sort, direction] + _sort_key(sort, record))
+
+
+def parse_grid_cursor(value, sort, direction):
+    """Parse a cursor into the sort key values it continues after.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another
+            sort or direction
+    """
+    key = parse_cursor(value, 'grid', len(GRID_SORTS[sort]) + 2)
+    if key[:2] != [sort, direction]:
+        raise ValueError(f"Invalid grid cursor: {value}")
+    return key[2:]
+
+
+def _filtered(stmt, lab_id, unit, stock):
+    if lab_id is not None:
+        stmt = stmt.where(Product.lab_id == lab_id)
+    if unit:
+        stmt = stmt.where(Product.unit == unit)
+    if stock:
+        stmt = stmt.where(GRID_STOCK_FILTERS[stock])
+    return stmt
+
+
+def grid_page(sort='name', direction='asc', lab_id=None, unit=None,
+              stock=None, after=None, limit=None):
+    """Return one page of the all labs inventory grid.
+
+    Pages continue after the sort key of the previous one, read from
+    the index of that key.
+
+    Args:
+        sort: Key of GRID_SORTS
+        direction: 'asc' or 'desc'
+        lab_id: Optional lab to restrict the grid to
+        unit: Optional unit to restrict the grid to
+        stock: Optional key of GRID_STOCK_FILTERS
+        after: Values from parse_grid_cursor(), or None for the first page
+        limit: Page size, default ``INVENTORY_GRID_PAGE_SIZE``
+
+    Returns:
+        tuple: (list of ProductRecord, cursor of the next page or None)
+    """
+    if limit is None:
+        limit = current_app.config.get('INVENTORY_GRID_PAGE_SIZE', 200)
+    columns = [
+        (column, descending != (direction == 'desc'))
+        for column, descending in GRID_SORTS[sort]
+    ]
+    stmt = _filtered(Product.record_select(), lab_id, unit, stock)\
+        .order_by(*(
+            column.desc() if descending else column
+            for column, descending in columns
+        )).limit(limit + 1)
+    if after is not None:
+        stmt = stmt.where(seek(columns, after))
+
+    rows = [ProductRecord(*row) for row in db.session.execute(stmt)]
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_grid_cursor(sort, direction, rows[-1])
+
+
+def grid_total(lab_id=None, unit=None, stock=None):
+    """Return the number of rows of the grid, or None if unknown.
+
+    Read from the lab counters, so it costs one row per lab. Counts
+    filtered by unit are not kept and would need a scan; the grid then
+    sizes itself from the pages loaded so far.
+    """
+    if unit:
+        return None
+    count = {
+        None: Lab.product_count,
+        'ok': Lab.product_count - Lab.low_stock_count
+        - Lab.out_of_stock_count,
+        'low': Lab.low_stock_count,
+        'out': Lab.out_of_stock_count,
+    }[stock]
+    stmt = select(func.coalesce(func.sum(count), 0))
+    if lab_id is not None:
+        stmt = stmt.where(Lab.id == lab_id)
+    return db.session.execute(stmt).scalar()
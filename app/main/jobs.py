@@ -0,0 +1,332 @@
+# app/main/jobs.py
+
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from flask import Flask
+
+from app.extensions import db, socketio
+from app.main.exports import ChunkPipe, iter_export_rows, write_export
+from app.models import Lab
+
+
+# Config keys a worker process needs to read the inventory
+WORKER_CONFIG_KEYS = (
+    'SQLALCHEMY_DATABASE_URI',
+    'SQLALCHEMY_BINDS',
+    'SQLALCHEMY_ENGINE_OPTIONS',
+    'SQLALCHEMY_TRACK_MODIFICATIONS',
+    'EXPORT_BATCH_SIZE',
+)
+
+# Formats that are already compressed containers are stored as-is
+BUNDLE_COMPRESSION = {
+    'xlsx': zipfile.ZIP_STORED,
+    'docx': zipfile.ZIP_STORED,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+_jobs = {}
+_jobs_lock = threading.Lock()
+_worker_app = None
+
+
+class ExportJob:
+    """An export rendered in the background by the process pool."""
+
+    def __init__(self, owner_id, lab_code, format, filename, directory):
+        self.id = uuid.uuid4().hex
+        self.owner_id = owner_id
+        self.lab_code = lab_code
+        self.format = format
+        self.filename = filename
+        self.path = os.path.join(directory, f"{self.id}.{format}")
+        self.progress_path = os.path.join(directory, f"{self.id}.json")
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self.error = None
+        self.urls = {}
+
+    @property
+    def status(self):
+        if self.future is None:
+            return 'queued'
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        if self.future.cancelled() or self.future.exception() is not None:
+            return 'failed'
+        return 'finished'
+
+    @property
+    def rows_processed(self):
+        """Rows written so far, as reported by the worker."""
+        try:
+            with open(self.progress_path) as f:
+                return json.load(f)['rows_processed']
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def to_dict(self):
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'format': self.format,
+            'lab': self.lab_code or 'all',
+            'filename': self.filename,
+            'rows_processed': self.rows_processed,
+            'created_at': datetime.utcfromtimestamp(
+                self.created_at
+            ).isoformat(),
+            'status_url': self.urls.get('status'),
+        }
+        if self.status == 'finished':
+            data['download_url'] = self.urls.get('download')
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+def _init_worker(config):
+    """Create a minimal app with a database connection in a worker."""
+    global _worker_app
+    _worker_app = Flask(__name__)
+    _worker_app.config.update(config)
+    db.init_app(_worker_app)
+
+
+def _write_progress(path, rows_processed):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'rows_processed': rows_processed}, f)
+    os.replace(tmp_path, path)
+
+
+def _track_progress(rows, path, every):
+    """Pass rows through while reporting the running count to disk."""
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % every == 0:
+            _write_progress(path, count)
+    _write_progress(path, count)
+
+
+def _render_to_file(path, lab_code, format, progress_path=None):
+    """Render one export to path, replacing it only once complete."""
+    lab = None
+    if lab_code:
+        lab = Lab.query.filter_by(code=lab_code).first()
+        if lab is None:
+            raise ValueError(f"Lab {lab_code} no longer exists")
+
+    rows = iter_export_rows(lab)
+    if progress_path:
+        every = _worker_app.config.get('EXPORT_BATCH_SIZE', 1000)
+        rows = _track_progress(rows, progress_path, every)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write_export(f, format, rows, lab_code)
+    os.replace(tmp_path, path)
+
+
+def _run_export_job(path, progress_path, lab_code, format):
+    """Render one export to disk inside a worker process.
+
+    Returns:
+        int: Number of rows exported
+    """
+    with _worker_app.app_context():
+        _render_to_file(path, lab_code, format, progress_path)
+
+    with open(progress_path) as f:
+        return json.load(f)['rows_processed']
+
+
+def _run_bundle_member(path, lab_code, format):
+    """Render one member of an export bundle inside a worker process."""
+    with _worker_app.app_context():
+        _render_to_file(path, lab_code, format)
+    return path
+
+
+def _get_executor(app):
+    """Return the process pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            config = {
+                key: app.config[key]
+                for key in WORKER_CONFIG_KEYS
+                if key in app.config
+            }
+            _executor = ProcessPoolExecutor(
+                max_workers=app.config.get('EXPORT_JOB_WORKERS', 2),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(config,)
+            )
+        return _executor
+
+
+def _job_directory(app):
+    directory = app.config.get('EXPORT_JOB_DIR') or os.path.join(
+        app.instance_path, 'export_jobs'
+    )
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _prune_jobs(ttl):
+    """Forget finished jobs older than ttl seconds and delete their files."""
+    cutoff = time.time() - ttl
+    with _jobs_lock:
+        expired = [
+            job for job in _jobs.values()
+            if job.finished_at and job.finished_at < cutoff
+        ]
+        for job in expired:
+            del _jobs[job.id]
+    for job in expired:
+        for path in (job.path, job.progress_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _job_done(app, job, future):
+    """Record the job outcome and notify the owning user."""
+    job.finished_at = time.time()
+    error = None if future.cancelled() else future.exception()
+    if future.cancelled():
+        job.error = 'Export job was cancelled'
+    elif error is not None:
+        job.error = str(error) or error.__class__.__name__
+        app.logger.error(f"Export job {job.id} failed: {job.error}")
+
+    try:
+        socketio.emit(
+            'export_ready',
+            job.to_dict(),
+            to=f"user_{job.owner_id}"
+        )
+    except Exception as e:
+        app.logger.error(f"Error notifying export job {job.id}: {str(e)}")
+
+
+def submit_export_job(app, user, lab, format, filename, urls):
+    """Queue an export for rendering in the process pool.
+
+    Args:
+        app: Flask application instance
+        user: The user requesting the export
+        lab: Lab to export, or None for all labs
+        format: Export format
+        filename: Download file name
+        urls: Callable mapping a job id to its status/download URLs
+
+    Returns:
+        ExportJob: The queued job
+    """
+    _prune_jobs(app.config.get('EXPORT_JOB_TTL', 3600))
+
+    job = ExportJob(
+        owner_id=user.id,
+        lab_code=lab.code if lab else None,
+        format=format,
+        filename=filename,
+        directory=_job_directory(app)
+    )
+    job.urls = urls(job.id)
+    _write_progress(job.progress_path, 0)
+    with _jobs_lock:
+        _jobs[job.id] = job
+
+    job.future = _get_executor(app).submit(
+        _run_export_job, job.path, job.progress_path, job.lab_code, format
+    )
+    job.future.add_done_callback(
+        lambda future: _job_done(app, job, future)
+    )
+    return job
+
+
+def iter_export_bundle(app, members):
+    """Render exports in the process pool and stream them as one ZIP.
+
+    Every member is submitted to the pool up front and added to the
+    archive as soon as its worker finishes, so the first files reach the
+    client while the remaining ones are still being rendered.
+
+    Args:
+        app: Flask application instance
+        members: Iterable of (lab_code, format, archive_name) tuples
+
+    Yields:
+        bytes: ZIP archive chunks
+    """
+    directory = os.path.join(
+        _job_directory(app), f"bundle-{uuid.uuid4().hex}"
+    )
+    os.makedirs(directory)
+
+    executor = _get_executor(app)
+    futures = {}
+    for index, (lab_code, format, name) in enumerate(members):
+        path = os.path.join(directory, f"{index}.{format}")
+        future = executor.submit(_run_bundle_member, path, lab_code, format)
+        futures[future] = (name, format)
+
+    pipe = ChunkPipe()
+
+    def write_archive():
+        with zipfile.ZipFile(pipe, 'w') as archive:
+            for future in as_completed(futures):
+                path = future.result()
+                name, format = futures[future]
+                archive.write(
+                    path,
+                    name,
+                    compress_type=BUNDLE_COMPRESSION.get(
+                        format, zipfile.ZIP_DEFLATED
+                    )
+                )
+                os.remove(path)
+
+    try:
+        yield from pipe.stream(write_archive)
+    finally:
+        for future in futures:
+            future.cancel()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def get_export_job(job_id):
+    """Return the job with the given id, or None."""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def shutdown_export_jobs():
+    """Stop the process pool and forget all jobs."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+        _jobs.clear()
+    for job in jobs:
+        for path in (job.path, job.progress_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,153 @@
+# app/main/lab_changes.py
+
+from sqlalchemy import bindparam, event, inspect, update
+from sqlalchemy.orm import object_session
+
+from app.extensions import db
+from app.models import Lab, Product
+
+_listeners = []
+_lab_listeners = []
+
+
+def on_products_committed(listener):
+    """Register a callback for committed product changes.
+
+    The callback receives the set of lab ids whose products were
+    inserted, updated or deleted by the committed transaction. Can be
+    used as a decorator.
+    """
+    _listeners.append(listener)
+    return listener
+
+
+def on_labs_committed(listener):
+    """Register a callback for committed Lab inserts, updates or deletes.
+
+    The callback takes no arguments. Can be used as a decorator.
+    """
+    _lab_listeners.append(listener)
+    return listener
+
+
+def _record_write(target, lab_id, counters, sign):
+    """Remember a lab written in the current transaction and flush.
+
+    Args:
+        target: Product written
+        lab_id: Lab the product is added to (sign 1) or removed from (-1)
+        counters: The product's Product.stock_counters()
+        sign: 1 or -1
+    """
+    session = object_session(target)
+    if session is None or lab_id is None:
+        return
+    session.info.setdefault('changed_lab_ids', set()).add(lab_id)
+    deltas = session.info.setdefault('flushed_lab_deltas', {})
+    current = deltas.get(lab_id, (0, 0, 0, 0))
+    deltas[lab_id] = tuple(c + sign * n for c, n in zip(current, counters))
+
+
+def _previous(target, key):
+    """Return the value an attribute had before the current flush."""
+    history = inspect(target).attrs[key].history
+    return history.deleted[0] if history.deleted else getattr(target, key)
+
+
+@event.listens_for(Product, 'after_insert')
+def _track_product_insert(mapper, connection, target):
+    counters = Product.stock_counters(target.quantity, target.minimum_quantity)
+    _record_write(target, target.lab_id, counters, 1)
+
+
+@event.listens_for(Product, 'after_update')
+def _track_product_update(mapper, connection, target):
+    # A product moved between labs changes both of them
+    _record_write(target, _previous(target, 'lab_id'), Product.stock_counters(
+        _previous(target, 'quantity'), _previous(target, 'minimum_quantity')
+    ), -1)
+    _record_write(target, target.lab_id, Product.stock_counters(
+        target.quantity, target.minimum_quantity
+    ), 1)
+
+
+@event.listens_for(Product, 'before_delete')
+def _track_product_delete(mapper, connection, target):
+    # Before the DELETE, so expired attributes can still be loaded
+    _record_write(target, _previous(target, 'lab_id'), Product.stock_counters(
+        _previous(target, 'quantity'), _previous(target, 'minimum_quantity')
+    ), -1)
+
+
+@event.listens_for(Product.lab_id, 'set', active_history=True)
+@event.listens_for(Product.quantity, 'set', active_history=True)
+@event.listens_for(Product.minimum_quantity, 'set', active_history=True)
+def _load_previous_value(target, value, oldvalue, initiator):
+    """Load the old value of an expired product before it is changed.
+
+    Without active history the old value is not in the attribute
+    history, so the lab a product left, or the stock it had, would
+    go unnoticed.
+    """
+
+
+@event.listens_for(Lab, 'after_insert')
+@event.listens_for(Lab, 'after_update')
+@event.listens_for(Lab, 'after_delete')
+def _track_lab_write(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info['labs_changed'] = True
+
+
+@event.listens_for(db.session, 'after_flush')
+def _apply_lab_writes(session, flush_context):
+    """Bump the revision and counters of every lab written by this flush.
+
+    One executemany UPDATE per flush, inside the flush's transaction,
+    so revisions and counters can never be seen without the product
+    changes or the other way round.
+    """
+    deltas = session.info.pop('flushed_lab_deltas', None)
+    if not deltas:
+        return
+    table = Lab.__table__
+    session.connection().execute(
+        update(table).where(table.c.id == bindparam('b_lab_id')).values(
+            revision=table.c.revision + 1,
+            product_count=table.c.product_count + bindparam('b_products'),
+            total_units=table.c.total_units + bindparam('b_units'),
+            low_stock_count=table.c.low_stock_count + bindparam('b_low'),
+            out_of_stock_count=(
+                table.c.out_of_stock_count + bindparam('b_out')
+            )
+        ),
+        [
+            {
+                'b_lab_id': lab_id,
+                'b_products': products,
+                'b_units': units,
+                'b_low': low,
+                'b_out': out
+            }
+            for lab_id, (products, units, low, out) in sorted(deltas.items())
+        ]
+    )
+
+
+@event.listens_for(db.session, 'after_commit')
+def _notify_after_commit(session):
+    lab_ids = session.info.pop('changed_lab_ids', None)
+    if lab_ids:
+        for listener in _listeners:
+            listener(lab_ids)
+    if session.info.pop('labs_changed', False):
+        for listener in _lab_listeners:
+            listener()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _forget_after_rollback(session):
+    session.info.pop('changed_lab_ids', None)
+    session.info.pop('flushed_lab_deltas', None)
+    session.info.pop('labs_changed', None)
@@ -0,0 +1,109 @@
+# app/main/lab_registry.py
+
+import hashlib
+import threading
+import time
+from collections import namedtuple
+from flask import abort, current_app, has_app_context
+
+from app.extensions import db
+from app.main.lab_changes import on_labs_committed
+from app.models import Lab
+
+# Fields of a lab; read-only and not bound to any session
+LabRecord = namedtuple('LabRecord', [
+    'id', 'code', 'name', 'description', 'location', 'max_cabinets'
+])
+
+_lock = threading.Lock()
+
+
+class _Snapshot:
+    """Labs loaded in one query, indexed for lookups."""
+
+    def __init__(self, labs):
+        self.labs = tuple(labs)
+        self.by_id = {lab.id: lab for lab in self.labs}
+        self.by_code = {lab.code: lab for lab in self.labs}
+        self.choices = [(lab.id, f"{lab.code} - {lab.name}")
+                        for lab in self.labs]
+        self.version = hashlib.sha1(
+            repr(self.labs).encode('utf-8')
+        ).hexdigest()[:16]
+        self.loaded_at = time.monotonic()
+
+
+def load():
+    """Load every lab into the registry of the current app.
+
+    Called once at startup; afterwards the registry reloads itself on
+    first use after a Lab commit, or after ``LAB_REGISTRY_TTL`` seconds
+    to pick up labs changed by other processes (e.g. ``flask
+    seed-labs``).
+    """
+    rows = db.session.execute(db.select(
+        Lab.id, Lab.code, Lab.name, Lab.description, Lab.location,
+        Lab.max_cabinets
+    ).order_by(Lab.code)).all()
+    snapshot = _Snapshot(LabRecord(*row) for row in rows)
+    current_app.extensions['lab_registry'] = snapshot
+    return snapshot
+
+
+def _snapshot():
+    snapshot = current_app.extensions.get('lab_registry')
+    ttl = current_app.config.get('LAB_REGISTRY_TTL', 300)
+    if snapshot is None or time.monotonic() - snapshot.loaded_at >= ttl:
+        with _lock:
+            snapshot = current_app.extensions.get('lab_registry')
+            if snapshot is None or \
+                    time.monotonic() - snapshot.loaded_at >= ttl:
+                snapshot = load()
+    return snapshot
+
+
+def all_labs():
+    """Return every lab, ordered by code."""
+    return list(_snapshot().labs)
+
+
+def get(lab_id):
+    """Return the lab with the given id, or None."""
+    return _snapshot().by_id.get(lab_id)
+
+
+def get_by_code(code):
+    """Return the lab with the given code, or None."""
+    return _snapshot().by_code.get(code)
+
+
+def get_or_404(lab_id):
+    return get(lab_id) or abort(404)
+
+
+def get_by_code_or_404(code):
+    return get_by_code(code) or abort(404)
+
+
+def version():
+    """Return a token that changes whenever any lab does."""
+    return _snapshot().version
+
+
+def choices(exclude_id=None):
+    """Return ``(id, "code - name")`` select choices, ordered by code.
+
+    Args:
+        exclude_id: Optional lab id to leave out, e.g. a transfer source
+    """
+    return [
+        choice for choice in _snapshot().choices
+        if choice[0] != exclude_id
+    ]
+
+
+@on_labs_committed
+def invalidate():
+    """Drop the registry so the next lookup reloads it."""
+    if has_app_context():
+        current_app.extensions.pop('lab_registry', None)
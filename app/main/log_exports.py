@@ -0,0 +1,182 @@
+# app/main/log_exports.py
+
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+from app.main.cursors import seek
+from app.main.export_metrics import ExportMetrics
+from app.main.exports import generate_csv, generate_excel
+from app.models import Lab, Product, TransferLog, User, UserLog
+
+
+USER_LOG_COLUMNS = [
+    'Timestamp', 'User', 'Action', 'Lab', 'Product',
+    'Registry Number', 'Quantity', 'Notes'
+]
+TRANSFER_LOG_COLUMNS = [
+    'Timestamp', 'User', 'Product', 'Registry Number',
+    'Source Lab', 'Destination Lab', 'Quantity', 'Notes'
+]
+LOG_EXPORT_FORMATS = ('csv', 'xlsx')
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class LogExportFilters:
+    """Filters of a log export, parsed from request arguments."""
+
+    def __init__(self, start=None, end=None, user=None, lab=None,
+                 action=None):
+        self.start = start
+        self.end = end
+        self.user = user
+        self.lab = lab
+        self.action = action
+
+    @classmethod
+    def from_args(cls, args):
+        """Parse start/end (YYYY-MM-DD, UTC), user, lab and action.
+
+        The end date is inclusive.
+
+        Raises:
+            ValueError: If a date cannot be parsed
+        """
+        def parse_date(name):
+            value = args.get(name)
+            if not value:
+                return None
+            try:
+                return datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                raise ValueError(f"Invalid {name} date: {value}")
+
+        end = parse_date('end')
+        return cls(
+            start=parse_date('start'),
+            end=end + timedelta(days=1) if end else None,
+            user=args.get('user') or None,
+            lab=args.get('lab') or None,
+            action=args.get('action') or None
+        )
+
+    def apply(self, stmt, timestamp, user, labs, action=None):
+        """Restrict stmt to these filters.
+
+        Args:
+            stmt: Select to filter
+            timestamp: Timestamp column of the log
+            user: User entity joined into stmt
+            labs: Lab entities joined into stmt; a lab filter matches
+                any of them
+            action: Action column, if the log has one
+        """
+        if self.start:
+            stmt = stmt.where(timestamp >= self.start)
+        if self.end:
+            stmt = stmt.where(timestamp < self.end)
+        if self.user:
+            stmt = stmt.where(user.username == self.user)
+        if self.lab:
+            stmt = stmt.where(or_(*(lab.code == self.lab for lab in labs)))
+        if self.action and action is not None:
+            stmt = stmt.where(action == self.action)
+        return stmt
+
+
+def _iter_keyset(stmt, timestamp, id_column):
+    """Yield rows of stmt in (timestamp, id) order, one batch per query.
+
+    Each batch continues after the last key of the previous one. The
+    key columns must be the first two columns of stmt and are not
+    included in the yielded rows.
+    """
+    batch_size = current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    stmt = stmt.order_by(timestamp, id_column).limit(batch_size)
+    last = None
+    while True:
+        page = stmt
+        if last is not None:
+            page = page.where(
+                seek([(timestamp, False), (id_column, False)], last)
+            )
+        rows = db.session.execute(page).all()
+        for row in rows:
+            yield (row[0].strftime(TIMESTAMP_FORMAT),) + tuple(row[2:])
+        if len(rows) < batch_size:
+            return
+        last = rows[-1][0], rows[-1][1]
+
+
+def iter_user_log_rows(filters):
+    """Yield UserLog rows in USER_LOG_COLUMNS order.
+
+    User, lab and product names are resolved by joins in the same query.
+
+    Args:
+        filters: LogExportFilters to apply
+    """
+    stmt = select(
+        UserLog.timestamp,
+        UserLog.id,
+        User.username,
+        UserLog.action_type,
+        Lab.name,
+        Product.name,
+        Product.registry_number,
+        UserLog.quantity,
+        func.coalesce(UserLog.notes, '')
+    ).join(User, UserLog.user_id == User.id)\
+        .outerjoin(Lab, UserLog.lab_id == Lab.id)\
+        .outerjoin(Product, UserLog.product_id == Product.id)\
+        .where(UserLog.timestamp.isnot(None))
+    stmt = filters.apply(
+        stmt, UserLog.timestamp, User, [Lab], UserLog.action_type
+    )
+    return _iter_keyset(stmt, UserLog.timestamp, UserLog.id)
+
+
+def iter_transfer_log_rows(filters):
+    """Yield TransferLog rows in TRANSFER_LOG_COLUMNS order.
+
+    A lab filter matches transfers out of and into the lab.
+
+    Args:
+        filters: LogExportFilters to apply; action is ignored
+    """
+    source = aliased(Lab)
+    destination = aliased(Lab)
+    stmt = select(
+        TransferLog.timestamp,
+        TransferLog.id,
+        User.username,
+        Product.name,
+        Product.registry_number,
+        source.name,
+        destination.name,
+        TransferLog.quantity,
+        func.coalesce(TransferLog.notes, '')
+    ).join(User, TransferLog.created_by_id == User.id)\
+        .outerjoin(Product, TransferLog.product_id == Product.id)\
+        .join(source, TransferLog.source_lab_id == source.id)\
+        .join(destination, TransferLog.destination_lab_id == destination.id)
+    stmt = filters.apply(
+        stmt, TransferLog.timestamp, User, [source, destination]
+    )
+    return _iter_keyset(stmt, TransferLog.timestamp, TransferLog.id)
+
+
+def iter_log_export(format, rows, columns, sheet_name):
+    """Render log rows as a stream of csv or xlsx chunks."""
+    if format == 'csv':
+        render = generate_csv
+    elif format == 'xlsx':
+        def render(rows, columns):
+            return generate_excel(rows, columns, sheet_name)
+    else:
+        raise ValueError(f"Unsupported log export format: {format}")
+
+    metrics = ExportMetrics(format, sheet_name)
+    return metrics.track(render(metrics.count_rows(rows), columns))
@@ -0,0 +1,87 @@
+# app/main/low_stock.py
+
+from collections import namedtuple
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.main import lab_registry
+from app.main.cursors import encode_cursor, parse_cursor, seek
+from app.models import Product
+
+# Fields of a product listed as low on stock
+LowStockProduct = namedtuple('LowStockProduct', [
+    'id', 'lab_id', 'lab_code', 'name', 'registry_number', 'quantity',
+    'minimum_quantity', 'unit', 'location_display', 'stock_level'
+])
+
+
+# Listing order, served by the partial ix_product_low_stock index
+LOW_STOCK_ORDER = (
+    (Product.lab_id, False), (Product.name, False), (Product.id, False)
+)
+
+
+def encode_low_stock_cursor(product):
+    """Return the opaque cursor continuing after a LowStockProduct."""
+    return encode_cursor([product.lab_id, product.name, product.id])
+
+
+def parse_low_stock_cursor(value):
+    """Parse a cursor into its (lab_id, name, id) key.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    return tuple(parse_cursor(value, 'low stock', len(LOW_STOCK_ORDER)))
+
+
+def low_stock_page(lab_id=None, after=None, limit=None):
+    """Return one page of products at or below their minimum quantity.
+
+    Reads the ``low_stock`` flag through the partial
+    ix_product_low_stock index, which only holds low stock products, so
+    a page costs the same whatever the size of the inventory. Pages are
+    ordered by lab, name and id and continue after the key of the
+    previous one.
+
+    Args:
+        lab_id: Optional lab to restrict the listing to
+        after: Key from parse_low_stock_cursor(), or None for the first page
+        limit: Page size, default ``LOW_STOCK_PAGE_SIZE``
+
+    Returns:
+        tuple: (list of LowStockProduct, cursor of the next page or None)
+    """
+    if limit is None:
+        limit = current_app.config.get('LOW_STOCK_PAGE_SIZE', 50)
+    stmt = select(
+        Product.id,
+        Product.lab_id,
+        Product.name,
+        Product.registry_number,
+        Product.quantity,
+        Product.minimum_quantity,
+        Product.unit,
+        Product.location_display_expression()
+    ).where(
+        Product.low_stock.is_(True)
+    ).order_by(Product.lab_id, Product.name, Product.id).limit(limit + 1)
+    if lab_id is not None:
+        stmt = stmt.where(Product.lab_id == lab_id)
+    if after is not None:
+        stmt = stmt.where(seek(LOW_STOCK_ORDER, after))
+
+    rows = []
+    for (product_id, row_lab_id, name, registry_number, quantity,
+         minimum_quantity, unit, location_display) in db.session.execute(stmt):
+        lab = lab_registry.get(row_lab_id)
+        rows.append(LowStockProduct(
+            product_id, row_lab_id, lab.code if lab else None, name,
+            registry_number, quantity, minimum_quantity, unit,
+            location_display, 'out' if quantity <= 0 else 'low'
+        ))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_low_stock_cursor(rows[-1])
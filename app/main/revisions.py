@@ -0,0 +1,67 @@
+# app/main/revisions.py
+
+import hashlib
+import uuid
+from flask import Response, request, session
+from flask_login import current_user
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.main import lab_registry
+from app.models import Lab
+
+# Pages rendered by an earlier deployment must not match
+_BOOT_ID = uuid.uuid4().hex
+
+
+def lab_revision(lab_id=None):
+    """Return the inventory revision of a lab.
+
+    Without a lab, returns the sum of all lab revisions, which grows
+    whenever any lab changes.
+    """
+    if lab_id is not None:
+        return db.session.execute(
+            select(Lab.revision).where(Lab.id == lab_id)
+        ).scalar() or 0
+    return db.session.execute(
+        select(func.coalesce(func.sum(Lab.revision), 0))
+    ).scalar()
+
+
+def page_etag(lab_id=None):
+    """Return the strong ETag of the current page, or None.
+
+    Pages are identical for the same inventory revision, lab list,
+    user, role and URL. Pages about to show flashed messages are never
+    given an ETag, as the messages would be lost on a 304.
+
+    Args:
+        lab_id: Lab the page shows, or None for all labs
+    """
+    if session.get('_flashes'):
+        return None
+    parts = [
+        _BOOT_ID,
+        str(lab_revision(lab_id)),
+        lab_registry.version(),
+        str(current_user.get_id()),
+        current_user.role,
+        request.full_path
+    ]
+    return hashlib.sha1('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def not_modified(etag):
+    """Return a 304 response if the client already has this page."""
+    if etag and etag in request.if_none_match:
+        return with_etag(Response(status=304), etag)
+    return None
+
+
+def with_etag(response, etag):
+    """Set the ETag of a per-user page and make clients revalidate it."""
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -3,5 +3,6 @@
 from app.models.user import User
 from app.models.lab import Lab
 from app.models.product import Product
+from app.models.product_tombstone import ProductTombstone
 from app.models.transfer_log import TransferLog
 from app.models.user_log import UserLog
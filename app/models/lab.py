@@ -12,6 +12,23 @@ class Lab(db.Model):
     description = db.Column(db.Text)
     location = db.Column(db.String(200))
     max_cabinets = db.Column(db.Integer, nullable=False, default=8)
+    # Bumped in the same transaction as every write to the lab's products
+    revision = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0'
+    )
+    # Product totals, maintained with every product write
+    product_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0'
+    )
+    total_units = db.Column(
+        db.BigInteger, nullable=False, default=0, server_default='0'
+    )
+    low_stock_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0'
+    )
+    out_of_stock_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0'
+    )
 
     products = db.relationship('Product', backref='lab', lazy='dynamic')
 
@@ -1,9 +1,15 @@
 # app/models/product.py
 
+from collections import namedtuple
 from datetime import datetime
 from app.extensions import db
-from sqlalchemy.orm import validates, joinedload
-from sqlalchemy import event, text
+from app.models.lab import Lab
+from flask_sqlalchemy.pagination import SelectPagination
+from sqlalchemy.orm import validates
+from sqlalchemy import (
+    event, and_, case, false, func, literal, cast, select, String
+)
+from sqlalchemy.types import TypeDecorator, SmallInteger
 
 
 class ConcurrencyError(Exception):
@@ -11,6 +17,51 @@ class ConcurrencyError(Exception):
     pass
 
 
+# Read-only fields of a product for list views; not bound to any session
+ProductRecord = namedtuple('ProductRecord', [
+    'id', 'lab_id', 'lab_code', 'name', 'registry_number', 'quantity',
+    'unit', 'minimum_quantity', 'category', 'location_type',
+    'location_number', 'location_position', 'location_display',
+    'stock_level'
+])
+
+
+class RecordPagination(SelectPagination):
+    """Pagination of a Product.record_select() statement.
+
+    Items are ProductRecord tuples instead of the first column of each
+    row.
+    """
+
+    def _query_items(self):
+        stmt = self._query_args['select']\
+            .limit(self.per_page).offset(self._query_offset)
+        session = self._query_args['session']
+        return [ProductRecord(*row) for row in session.execute(stmt)]
+
+
+class CabinetPosition(TypeDecorator):
+    """Cabinet position stored as a small integer in shelf order.
+
+    Python code keeps using the position names; the database sorts
+    upper before lower instead of alphabetically.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    POSITIONS = ('upper', 'lower')
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self.POSITIONS.index(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.POSITIONS[value]
+
+
 class Product(db.Model):
     __tablename__ = 'product'
     
@@ -21,14 +72,20 @@ class Product(db.Model):
     unit = db.Column(db.String(20), nullable=False)
     minimum_quantity = db.Column(db.Integer, default=0)
     location_type = db.Column(db.String(20), nullable=False)
-    location_number = db.Column(db.String(20))
-    location_position = db.Column(db.String(10))
+    location_number = db.Column(db.Integer)
+    location_position = db.Column(CabinetPosition)
+    category = db.Column(db.String(100))
+    # At or below the minimum quantity; set on every write
+    low_stock = db.Column(
+        db.Boolean, nullable=False, default=False, server_default=false()
+    )
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime,
         default=datetime.utcnow,
-        onupdate=datetime.utcnow
+        onupdate=datetime.utcnow,
+        index=True
     )
     version_id = db.Column(db.Integer, nullable=False, default=1)
     
@@ -47,6 +104,11 @@ class Product(db.Model):
         ),
     )
 
+    @validates('name')
+    def validate_name(self, key, value):
+        self.category = self.get_category_from_name(value)
+        return value
+
     @validates('registry_number')
     def validate_registry_number(self, key, value):
         if not value:
@@ -79,6 +141,26 @@ class Product(db.Model):
             raise ValueError("Invalid location type")
         return value
 
+    @validates('location_number')
+    def validate_location_number(self, key, value):
+        if value is None or value == '':
+            return None
+        try:
+            value = int(value)
+        except (ValueError, TypeError):
+            raise ValueError("Cabinet number must be a whole number")
+        if value < 1:
+            raise ValueError("Cabinet number must be 1 or greater")
+        return value
+
+    @validates('location_position')
+    def validate_location_position(self, key, value):
+        if not value:
+            return None
+        if value not in CabinetPosition.POSITIONS:
+            raise ValueError("Invalid cabinet position")
+        return value
+
     def update_record(self, data: dict):
         """Update product record with optimistic locking."""
         if (
@@ -104,6 +186,59 @@ class Product(db.Model):
         
         return "Unknown"
 
+    @classmethod
+    def location_display_expression(cls):
+        """SQL expression equivalent to get_location_display()."""
+        cabinet = literal('Cabinet ') + func.coalesce(
+            cast(cls.location_number, String), ''
+        )
+        position = case(
+            *(
+                (cls.location_position == p, f", Position {p}")
+                for p in CabinetPosition.POSITIONS
+            ),
+            else_=''
+        )
+        return case(
+            (cls.location_type == 'workspace', 'Workspace'),
+            (cls.location_type == 'cabinet', cabinet + position),
+            else_='Unknown'
+        )
+
+    @classmethod
+    def stock_level_expression(cls):
+        """SQL expression equivalent to check_stock_level()."""
+        return case(
+            (cls.quantity <= 0, 'out'),
+            (cls.quantity <= func.coalesce(cls.minimum_quantity, 0), 'low'),
+            else_='ok'
+        )
+
+    @classmethod
+    def record_select(cls):
+        """Core SELECT of ProductRecord fields, joined to the lab code.
+
+        Location display and stock level are computed in SQL, and notes,
+        timestamps and version are never loaded, so list views build
+        one tuple per row instead of a tracked ORM instance.
+        """
+        return select(
+            cls.id,
+            cls.lab_id,
+            Lab.code,
+            cls.name,
+            cls.registry_number,
+            cls.quantity,
+            cls.unit,
+            cls.minimum_quantity,
+            cls.category,
+            cls.location_type,
+            cls.location_number,
+            cls.location_position,
+            cls.location_display_expression(),
+            cls.stock_level_expression()
+        ).join(Lab, cls.lab_id == Lab.id)
+
     def check_stock_level(self):
         """Check current stock level status."""
         if self.quantity <= 0:
@@ -112,20 +247,54 @@ class Product(db.Model):
             return 'low'
         return 'ok'
 
+    @staticmethod
+    def stock_counters(quantity, minimum_quantity):
+        """Return a product's share of its lab's counters.
+
+        Returns:
+            tuple: (products, units, low stock, out of stock), where low
+                and out of stock follow check_stock_level()
+        """
+        quantity = quantity or 0
+        out = quantity <= 0
+        low = not out and quantity <= (minimum_quantity or 0)
+        return 1, quantity, int(low), int(out)
+
+    @classmethod
+    def stock_counter_expressions(cls):
+        """SQL aggregates equivalent to summing stock_counters()."""
+        minimum = func.coalesce(cls.minimum_quantity, 0)
+        return (
+            func.count(cls.id),
+            func.coalesce(func.sum(cls.quantity), 0),
+            func.coalesce(func.sum(case(
+                (and_(cls.quantity > 0, cls.quantity <= minimum), 1),
+                else_=0
+            )), 0),
+            func.coalesce(func.sum(case((cls.quantity <= 0, 1), else_=0)), 0)
+        )
+
     @classmethod
     def search(cls, query, lab_id=None, page=1, per_page=20):
-        """Search products by name or registry number."""
-        base_query = cls.query
+        """Search products by name or registry number.
+
+        Returns:
+            Pagination: Pagination of ProductRecord tuples
+        """
+        stmt = cls.record_select()
         if lab_id:
-            base_query = base_query.filter_by(lab_id=lab_id)
+            stmt = stmt.where(cls.lab_id == lab_id)
 
         search = f"%{query}%"
-        return base_query.filter(
+        stmt = stmt.where(
             db.or_(
                 cls.name.ilike(search),
                 cls.registry_number.ilike(search)
             )
-        ).paginate(
+        ).order_by(cls.lab_id, cls.name, cls.id)
+        return RecordPagination(
+            select=stmt,
+            session=db.session(),
             page=page,
             per_page=per_page,
             error_out=False
@@ -143,56 +312,64 @@ class Product(db.Model):
         return "Uncategorized"
 
     @classmethod
-    def get_sorted_products(cls, lab_id):
-        """Get products sorted by location, category, and name."""
-        products = cls.query.filter_by(lab_id=lab_id)\
-            .options(joinedload(cls.lab))\
-            .order_by(
-                text("CASE WHEN location_type = 'workspace' THEN 0 ELSE 1 END"),
-                cls.location_number.nullslast(),
-                cls.location_position.nullslast(),
-                cls.name
-            ).all()
-        
-        location_groups = {}
-        for product in products:
-            location_key = (
-                product.location_type,
-                product.location_number or '',
-                product.location_position or ''
-            )
-            if location_key not in location_groups:
-                location_groups[location_key] = []
-            location_groups[location_key].append(product)
-        
-        sorted_locations = sorted(location_groups.keys(), key=lambda x: (
-            0 if x[0] == 'workspace' else 1,
-            x[1],
-            x[2]
-        ))
-        
-        result = []
-        for location in sorted_locations:
-            products = location_groups[location]
-            category_groups = {}
-            
-            for product in products:
-                category = cls.get_category_from_name(product.name)
-                if category not in category_groups:
-                    category_groups[category] = []
-                category_groups[category].append(product)
-            
-            # Sort products within categories
-            for products in category_groups.values():
-                products.sort(key=lambda x: x.name)
-            
-            result.append({
-                'location': location,
-                'location_display': products[0].get_location_display(),
-                'categories': category_groups
-            })
-        
-        return result
+    def display_order(cls):
+        """ORDER BY clauses of the dashboard, matching the display index.
+
+        Workspace sorts before cabinet, which sort by number, then upper
+        before lower position.
+        """
+        return (
+            cls.location_type.desc(),
+            cls.location_number,
+            cls.location_position,
+            cls.category,
+            cls.name
+        )
 
     def __repr__(self):
         return f'<Product {self.registry_number}>'
+
+
+# Matches Product.display_order() within a lab
+db.Index(
+    'ix_product_lab_display_order',
+    Product.lab_id,
+    Product.location_type.desc(),
+    Product.location_number,
+    Product.location_position,
+    Product.category,
+    Product.name
+)
+
+
+@event.listens_for(Product, 'before_insert')
+@event.listens_for(Product, 'before_update')
+def _set_low_stock(mapper, connection, target):
+    _, _, low, out = Product.stock_counters(
+        target.quantity, target.minimum_quantity
+    )
+    target.low_stock = bool(low or out)
+
+
+# Sort keys of the all labs inventory grid, see app.main.inventory_grid;
+# registry numbers are served by ix_product_registry_number
+db.Index('ix_product_grid_name', Product.name, Product.id)
+db.Index('ix_product_grid_quantity', Product.quantity, Product.id)
+db.Index('ix_product_grid_lab', Product.lab_id, Product.name, Product.id)
+db.Index(
+    'ix_product_grid_stock_level',
+    Product.low_stock.desc(),
+    Product.quantity,
+    Product.id
+)
+
+
+# Partial: only holds products at or below their minimum quantity
+db.Index(
+    'ix_product_low_stock',
+    Product.lab_id,
+    Product.name,
+    Product.id,
+    sqlite_where=Product.low_stock.is_(True),
+    postgresql_where=Product.low_stock.is_(True)
+)
@@ -0,0 +1,51 @@
+# app/models/product_tombstone.py
+
+from datetime import datetime
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models.product import Product
+
+
+class ProductTombstone(db.Model):
+    """Record of a product that left a lab, for delta exports."""
+    __tablename__ = 'product_tombstone'
+
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, nullable=False)
+    lab_id = db.Column(db.Integer, db.ForeignKey('lab.id'), nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    registry_number = db.Column(db.String(50), nullable=False)
+    deleted_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        index=True
+    )
+
+    def __repr__(self):
+        return f'<ProductTombstone {self.registry_number}>'
+
+
+def _insert_tombstone(connection, target, lab_id):
+    connection.execute(ProductTombstone.__table__.insert().values(
+        product_id=target.id,
+        lab_id=lab_id,
+        name=target.name,
+        registry_number=target.registry_number,
+        deleted_at=datetime.utcnow()
+    ))
+
+
+@event.listens_for(Product, 'after_delete')
+def record_deleted_product(mapper, connection, target):
+    """Leave a tombstone when a product is deleted."""
+    _insert_tombstone(connection, target, target.lab_id)
+
+
+@event.listens_for(Product, 'after_update')
+def record_moved_product(mapper, connection, target):
+    """Leave a tombstone in the old lab when a product changes lab."""
+    for lab_id in db.inspect(target).attrs.lab_id.history.deleted or ():
+        if lab_id is not None and lab_id != target.lab_id:
+            _insert_tombstone(connection, target, lab_id)
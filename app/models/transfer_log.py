@@ -13,3 +13,8 @@ class TransferLog(db.Model):
     source_lab_id = db.Column(db.Integer, db.ForeignKey('lab.id'), nullable=False)
     destination_lab_id = db.Column(db.Integer, db.ForeignKey('lab.id'), nullable=False)
     created_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+
+    # Keyset order of log exports
+    __table_args__ = (
+        db.Index('ix_transfer_log_timestamp_id', 'timestamp', 'id'),
+    )
@@ -17,5 +17,10 @@ class UserLog(db.Model):
     product = db.relationship('Product')
     lab = db.relationship('Lab')
 
+    # Keyset order of log exports
+    __table_args__ = (
+        db.Index('ix_user_log_timestamp_id', 'timestamp', 'id'),
+    )
+
     def __repr__(self):
         return f'<UserLog {self.action_type} by User {self.user_id}>'
@@ -1,6 +1,6 @@
 # app/socket_events.py
 
-from flask_socketio import emit, disconnect
+from flask_socketio import emit, disconnect, join_room
 from flask_login import current_user
 from flask import current_app
 from app.extensions import socketio, db
@@ -44,6 +44,8 @@ def handle_connect():
     while retry_count < max_retries:
         try:
             emit('status', {'msg': f'{current_user.username} connected'})
+            # Per-user room for targeted events such as export_ready
+            join_room(f'user_{current_user.id}')
             current_app.logger.info(f'Client connected: {current_user.username}')
             return True
         except Exception as e:
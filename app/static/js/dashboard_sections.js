@@ -0,0 +1,53 @@
+// Lazily loads dashboard location sections as they scroll into view
+document.addEventListener('DOMContentLoaded', () => {
+    const sections = document.querySelectorAll('.location-section[data-section-url]');
+
+    async function loadPage(section, observer) {
+        if (section.dataset.loading) {
+            return;
+        }
+        section.dataset.loading = 'true';
+        const loader = section.querySelector('.section-loader');
+        const url = new URL(section.dataset.sectionUrl, window.location.origin);
+        if (section.dataset.nextCursor) {
+            url.searchParams.set('after', section.dataset.nextCursor);
+        }
+
+        try {
+            const response = await fetch(url, { credentials: 'same-origin' });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            section.querySelector('.section-body')
+                .insertAdjacentHTML('beforeend', await response.text());
+
+            const nextCursor = response.headers.get('X-Next-Cursor');
+            if (nextCursor) {
+                section.dataset.nextCursor = nextCursor;
+                // Re-observe so a loader still in view fetches the next page
+                observer.unobserve(loader);
+                observer.observe(loader);
+            } else {
+                observer.unobserve(loader);
+                loader.remove();
+            }
+        } catch (error) {
+            console.error('Failed to load location section:', error);
+            loader.textContent = 'Could not load this location. Scroll to retry.';
+        } finally {
+            delete section.dataset.loading;
+        }
+    }
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach((entry) => {
+            if (entry.isIntersecting) {
+                loadPage(entry.target.closest('.location-section'), observer);
+            }
+        });
+    }, { rootMargin: '400px 0px' });
+
+    sections.forEach((section) => {
+        observer.observe(section.querySelector('.section-loader'));
+    });
+});
@@ -0,0 +1,181 @@
+// All labs inventory grid: sorted, filtered and paged by the server,
+// rendering only the rows in view
+document.addEventListener('DOMContentLoaded', () => {
+    const grid = document.getElementById('inventoryGrid');
+    if (!grid) {
+        return;
+    }
+    const viewport = grid.querySelector('.grid-viewport');
+    const spacer = grid.querySelector('.grid-spacer');
+    const status = grid.querySelector('.grid-status');
+    const filters = grid.querySelector('.grid-filters');
+    const sortButtons = grid.querySelectorAll('[data-sort]');
+
+    // Must match the row height in style.css
+    const ROW_HEIGHT = 36;
+    // Rows rendered above and below the viewport
+    const OVERSCAN = 10;
+    const STOCK_BADGES = {
+        ok: ['bg-success', 'In stock'],
+        low: ['bg-warning text-dark', 'Low stock'],
+        out: ['bg-danger', 'Out of stock'],
+    };
+
+    let sort = 'name';
+    let direction = 'asc';
+    let state = null;
+
+    function reset() {
+        state = {
+            rows: [],
+            next: null,
+            total: null,
+            done: false,
+            loading: false,
+            generation: state ? state.generation + 1 : 0,
+        };
+        sortButtons.forEach((button) => {
+            if (button.dataset.sort === sort) {
+                button.setAttribute(
+                    'aria-sort', direction === 'asc' ? 'ascending' : 'descending'
+                );
+            } else {
+                button.removeAttribute('aria-sort');
+            }
+        });
+        viewport.scrollTop = 0;
+        render();
+    }
+
+    async function loadMore() {
+        if (state.loading || state.done) {
+            return;
+        }
+        const current = state;
+        current.loading = true;
+        const url = new URL(grid.dataset.gridUrl, window.location.origin);
+        new FormData(filters).forEach((value, key) => {
+            if (value) {
+                url.searchParams.set(key, value);
+            }
+        });
+        url.searchParams.set('sort', sort);
+        url.searchParams.set('dir', direction);
+        if (current.next) {
+            url.searchParams.set('after', current.next);
+        }
+
+        try {
+            const response = await fetch(url, { credentials: 'same-origin' });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            const page = await response.json();
+            // Sort or filters changed while this page was in flight
+            if (current !== state) {
+                return;
+            }
+            current.rows.push(...page.products);
+            current.total = page.total;
+            current.next = page.next;
+            current.done = !page.next;
+        } catch (error) {
+            console.error('Failed to load inventory grid:', error);
+            status.textContent = 'Could not load the inventory. Scroll to retry.';
+            return;
+        } finally {
+            current.loading = false;
+        }
+        if (current === state) {
+            render();
+        }
+    }
+
+    function cell(text) {
+        const span = document.createElement('span');
+        span.textContent = text;
+        span.title = text;
+        return span;
+    }
+
+    function renderRow(product, index) {
+        const row = document.createElement('div');
+        row.className = 'grid-row';
+        row.style.top = `${index * ROW_HEIGHT}px`;
+        if (product.stock_level !== 'ok') {
+            row.classList.add('table-warning');
+        }
+        const [badgeClass, badgeText] = STOCK_BADGES[product.stock_level];
+        const badge = document.createElement('span');
+        badge.className = `badge ${badgeClass}`;
+        badge.textContent = badgeText;
+        const stock = document.createElement('span');
+        stock.appendChild(badge);
+        row.append(
+            cell(product.lab_code),
+            cell(product.name),
+            cell(product.registry_number),
+            cell(String(product.quantity)),
+            cell(product.unit),
+            cell(product.location_display),
+            stock
+        );
+        return row;
+    }
+
+    function render() {
+        const loaded = state.rows.length;
+        // Without a total, leave room for one more screen while pages remain
+        const extra = state.done ? 0 : Math.ceil(viewport.clientHeight / ROW_HEIGHT);
+        const size = state.total !== null ? Math.max(state.total, loaded) : loaded + extra;
+        spacer.style.height = `${size * ROW_HEIGHT}px`;
+
+        const wanted = Math.ceil(
+            (viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT
+        ) + OVERSCAN;
+        const first = Math.max(
+            0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN
+        );
+        const fragment = document.createDocumentFragment();
+        for (let i = first; i < Math.min(wanted, loaded); i++) {
+            fragment.appendChild(renderRow(state.rows[i], i));
+        }
+        spacer.replaceChildren(fragment);
+
+        if (state.total !== null) {
+            status.textContent = `${state.total} products`;
+        } else {
+            status.textContent = `${loaded}${state.done ? '' : '+'} products`;
+        }
+        // Pages are sequential, so a long jump loads every page up to it
+        if (wanted > loaded && !state.done) {
+            loadMore();
+        }
+    }
+
+    let frame = null;
+    viewport.addEventListener('scroll', () => {
+        if (frame === null) {
+            frame = requestAnimationFrame(() => {
+                frame = null;
+                render();
+            });
+        }
+    });
+
+    sortButtons.forEach((button) => {
+        button.addEventListener('click', () => {
+            if (button.dataset.sort === sort) {
+                direction = direction === 'asc' ? 'desc' : 'asc';
+            } else {
+                sort = button.dataset.sort;
+                direction = 'asc';
+            }
+            reset();
+        });
+    });
+    filters.addEventListener('change', reset);
+    filters.addEventListener('submit', (event) => event.preventDefault());
+
+    reset();
+});
@@ -71,6 +71,23 @@ document.addEventListener('DOMContentLoaded', () => {
             console.error('Error handling stock alert:', error);
         }
     });
+
+    // Arka plan dışa aktarma işleri
+    socket.on('export_ready', (data) => {
+        try {
+            const { filename, status, download_url, error } = data;
+            if (status === 'finished') {
+                showNotification(
+                    `Export ready: <a href="${download_url}" class="text-white fw-bold">${filename}</a>`,
+                    'success'
+                );
+            } else {
+                showNotification(`Export failed: ${error || filename}`, 'danger');
+            }
+        } catch (error) {
+            console.error('Error handling export job update:', error);
+        }
+    });
 });
 
 // Bildirim yardımcı fonksiyonları
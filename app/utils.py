@@ -1,9 +1,23 @@
 # app/utils.py
 
+import pytz
 from app.models import UserLog
 from app.extensions import db
 
 
+def format_timestamp(timestamp):
+    """Convert UTC timestamp to Europe/Istanbul timezone.
+    
+    Args:
+        timestamp: UTC datetime object
+    
+    Returns:
+        datetime: Localized datetime in Europe/Istanbul timezone
+    """
+    istanbul_tz = pytz.timezone('Europe/Istanbul')
+    return pytz.utc.localize(timestamp).astimezone(istanbul_tz)
+
+
 def create_user_log(
     user,
     action_type,
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Time and memory budget benchmark for the export generators.
+
+Runs every export format against synthetic all-labs inventories of
+1k, 10k and 100k rows and reports the wall time and the tracemalloc
+peak of each run. Exits with status 1 if any run exceeds its budget.
+
+Budgets are read from a JSON file (default: budgets.json next to this
+script) mapping each format to ``max_us_per_row`` (wall time per row)
+and ``max_peak_mib`` (peak traced memory), checked at every size. The
+streaming formats stay flat in memory; PDF and Word keep their page
+content and document tree until saved and grow with the row count.
+Wall time is the best of ``--repeat`` runs to smooth out noise.
+
+Usage:
+    PYTHONPATH=. python benchmarks/export_budgets.py
+    PYTHONPATH=. python benchmarks/export_budgets.py --formats csv xlsx \
+        --sizes 1000 10000 --budgets my_budgets.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from flask import Flask
+
+from app.main.exports import EXPORT_MIMETYPES, iter_export
+from export_scaling import synthetic_rows
+
+DEFAULT_BUDGETS = os.path.join(os.path.dirname(__file__), 'budgets.json')
+
+
+def measure(format, size, labs, trace=False):
+    """Render one export and return (seconds, peak bytes or None)."""
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    for _ in iter_export(format, synthetic_rows(size, labs)):
+        pass
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(formats, sizes, labs, budgets, repeat=3):
+    """Benchmark every format at every size and return the failures."""
+    failures = []
+    for format in formats:
+        budget = budgets.get(format, {})
+        # Warm up imports and caches so they do not count against 1k rows
+        measure(format, 100, labs)
+        for size in sizes:
+            # Time without tracemalloc, which slows allocation-heavy code
+            elapsed = min(
+                measure(format, size, labs)[0] for _ in range(repeat)
+            )
+            _, peak = measure(format, size, labs, trace=True)
+            us_per_row = elapsed / size * 1e6
+            peak_mib = peak / 1024 ** 2
+            print(
+                f"{format:>8} {size:>8} rows  {elapsed:8.3f}s  "
+                f"{us_per_row:8.1f} us/row  {peak_mib:8.1f} MiB peak"
+            )
+            if us_per_row > budget.get('max_us_per_row', float('inf')):
+                failures.append(
+                    f"{format} at {size} rows: {us_per_row:.1f} us/row "
+                    f"> {budget['max_us_per_row']}"
+                )
+            if peak_mib > budget.get('max_peak_mib', float('inf')):
+                failures.append(
+                    f"{format} at {size} rows: {peak_mib:.1f} MiB "
+                    f"> {budget['max_peak_mib']}"
+                )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--formats', nargs='+', choices=sorted(EXPORT_MIMETYPES),
+        default=sorted(EXPORT_MIMETYPES)
+    )
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 10000, 100000]
+    )
+    parser.add_argument('--labs', type=int, default=7)
+    parser.add_argument('--budgets', default=DEFAULT_BUDGETS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    with open(args.budgets) as f:
+        budgets = json.load(f)
+
+    # Generators read their settings from the app config
+    app = Flask(__name__)
+    app.config.update(
+        EXPORT_BATCH_SIZE=args.batch_size,
+        EXPORT_TRACE_MEMORY=False
+    )
+    with app.app_context():
+        failures = run(
+            args.formats, sorted(args.sizes), args.labs, budgets,
+            args.repeat
+        )
+
+    for failure in failures:
+        print(f"OVER BUDGET: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Row-count scaling benchmark for the export generators.
+
+Runs a generator against synthetic inventories of increasing size and
+prints the wall time per row. Generation time should grow linearly,
+i.e. the per-row cost should stay flat as the row count grows.
+
+Usage:
+    PYTHONPATH=. python benchmarks/export_scaling.py pdf
+    PYTHONPATH=. python benchmarks/export_scaling.py docx --sizes 1000 4000
+"""
+import argparse
+import sys
+import time
+
+from app.main.exports import generate_pdf, generate_word
+
+
+def synthetic_rows(count, labs=1):
+    """Yield all-labs export rows spread evenly over the given labs."""
+    for i in range(count):
+        lab = i * labs // count + 1
+        yield (
+            f"{lab} - Lab {lab}",
+            f"Resistor {i % 97}k Ohm",
+            f"REG-{i:07d}",
+            i % 50,
+            'Adet',
+            5,
+            f"Cabinet {i % 8 + 1}, Position upper",
+            'Synthetic row' if i % 3 else ''
+        )
+
+
+def lab_rows(count, labs=1):
+    """Yield single-lab export rows (without the lab column)."""
+    for row in synthetic_rows(count, labs):
+        yield row[1:]
+
+
+GENERATORS = {
+    'pdf': lambda count, labs: generate_pdf(lab_rows(count), 'BENCH'),
+    'pdf-all': lambda count, labs: generate_pdf(synthetic_rows(count, labs)),
+    'docx': lambda count, labs: generate_word(lab_rows(count), 'BENCH'),
+    'docx-all': lambda count, labs: generate_word(synthetic_rows(count, labs)),
+}
+
+
+def run(name, sizes, labs):
+    """Time one generator at every size and return (size, seconds) pairs."""
+    generator = GENERATORS[name]
+    results = []
+    for size in sizes:
+        start = time.perf_counter()
+        generator(size, labs)
+        elapsed = time.perf_counter() - start
+        results.append((size, elapsed))
+        print(
+            f"{name:>8} {size:>8} rows  {elapsed:8.3f}s  "
+            f"{elapsed / size * 1e6:8.1f} us/row"
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('generator', choices=sorted(GENERATORS))
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[500, 1000, 2000, 4000]
+    )
+    parser.add_argument('--labs', type=int, default=3)
+    parser.add_argument(
+        '--max-ratio', type=float, default=2.0,
+        help='Fail if per-row cost at the largest size exceeds the '
+             'smallest size by more than this factor'
+    )
+    args = parser.parse_args()
+
+    results = run(args.generator, sorted(args.sizes), args.labs)
+    (small, small_time), (large, large_time) = results[0], results[-1]
+    ratio = (large_time / large) / (small_time / small)
+    print(f"per-row cost ratio {large}/{small}: {ratio:.2f}")
+    return 0 if ratio <= args.max_ratio else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -72,6 +72,26 @@ class Config:
     # Timezone settings
     TIMEZONE = 'Europe/Istanbul'
     
+    # Export settings
+    EXPORT_BATCH_SIZE = 1000  # Rows fetched per server-side cursor batch
+    EXPORT_JOB_WORKERS = 2  # Processes rendering background export jobs
+    EXPORT_JOB_DIR = os.environ.get('EXPORT_JOB_DIR')  # Default: instance/
+    EXPORT_JOB_TTL = 3600  # Seconds finished job files are kept
+    EXPORT_CACHE_ENABLED = True
+    EXPORT_CACHE_DIR = os.environ.get('EXPORT_CACHE_DIR')  # Default: instance/
+    EXPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # LRU-evicted beyond this
+    EXPORT_COALESCE_TIMEOUT = 300  # Max seconds to wait on an identical export
+    EXPORT_SPOOL_MAX_MEMORY = 8 * 1024 * 1024  # Spooled to disk beyond this
+    EXPORT_TRACE_MEMORY = False  # Log tracemalloc peak memory per export
+    EXPORT_DELTA_OVERLAP = 60  # Seconds delta cursors are moved back by
+
+    # Dashboard Configuration
+    DASHBOARD_CACHE_TTL = 300  # Seconds lab location sections are cached
+    DASHBOARD_SECTION_PAGE_SIZE = 100  # Products per lazily loaded page
+    LOW_STOCK_PAGE_SIZE = 50  # Products per low stock page
+    INVENTORY_GRID_PAGE_SIZE = 200  # Rows per all labs grid request
+    LAB_REGISTRY_TTL = 300  # Seconds before labs are reloaded from the DB
+    
     # Mail Configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 25)
@@ -114,6 +134,7 @@ class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///app.db'
     RATELIMIT_STORAGE_URL = 'memory://'  # Memory storage in development
+    EXPORT_TRACE_MEMORY = True  # Slows the whole process; never in production
 
 
 class TestingConfig(Config):
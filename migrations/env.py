@@ -19,6 +19,9 @@ def get_engine():
         # This allows running migrations without app context 
         # for --autogenerate
         return current_app.extensions['sqlalchemy'].get_engine()
+    except AttributeError:
+        # Flask-SQLAlchemy 3.1 removed get_engine()
+        return current_app.extensions['migrate'].db.engine
 
 
 def get_engine_url():
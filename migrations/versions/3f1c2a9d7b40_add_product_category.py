@@ -0,0 +1,49 @@
+"""add stored product category
+
+Revision ID: 3f1c2a9d7b40
+Revises:
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b40'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEX_COLUMNS = [
+    'lab_id', 'location_type', 'location_number',
+    'location_position', 'category', 'name'
+]
+
+
+def upgrade():
+    # Databases created by db.create_all(), rather than upgraded, already
+    # match the models; this and later migrations skip what exists
+    inspector = sa.inspect(op.get_bind())
+    if 'product' not in inspector.get_table_names():
+        return
+    columns = {column['name'] for column in inspector.get_columns('product')}
+    indexes = {index['name'] for index in inspector.get_indexes('product')}
+
+    if 'category' not in columns:
+        with op.batch_alter_table('product', schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column('category', sa.String(length=100), nullable=True)
+            )
+    if 'ix_product_lab_display_order' not in indexes:
+        with op.batch_alter_table('product', schema=None) as batch_op:
+            batch_op.create_index(
+                'ix_product_lab_display_order', INDEX_COLUMNS, unique=False
+            )
+    # Existing rows are filled by `flask backfill-categories`
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index('ix_product_lab_display_order')
+        batch_op.drop_column('category')
@@ -0,0 +1,125 @@
+"""store cabinet number and position as integers
+
+Revision ID: 8a4e6c1f2d93
+Revises: 3f1c2a9d7b40
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4e6c1f2d93'
+down_revision = '3f1c2a9d7b40'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_product_lab_display_order'
+# Stored value of each position is its index, in shelf order
+POSITIONS = ('upper', 'lower')
+
+product = sa.table(
+    'product',
+    sa.column('id', sa.Integer),
+    sa.column('location_number', sa.String),
+    sa.column('location_position', sa.String),
+    sa.column('cabinet_number', sa.Integer),
+    sa.column('cabinet_position', sa.SmallInteger),
+)
+
+
+def _parse_number(value):
+    try:
+        number = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+
+def _parse_position(value):
+    value = (value or '').strip().lower()
+    return POSITIONS.index(value) if value in POSITIONS else None
+
+
+def _create_display_index():
+    op.create_index(INDEX_NAME, 'product', [
+        'lab_id', sa.text('location_type DESC'), 'location_number',
+        'location_position', 'category', 'name'
+    ])
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'product' not in inspector.get_table_names():
+        return
+    columns = {c['name']: c for c in inspector.get_columns('product')}
+    # Cabinet numbers are already integers if made by db.create_all()
+    if isinstance(columns['location_number']['type'], sa.Integer):
+        return
+
+    if INDEX_NAME in {i['name'] for i in inspector.get_indexes('product')}:
+        op.drop_index(INDEX_NAME, table_name='product')
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cabinet_number', sa.Integer()))
+        batch_op.add_column(sa.Column('cabinet_position', sa.SmallInteger()))
+
+    rows = bind.execute(sa.select(
+        product.c.id, product.c.location_number, product.c.location_position
+    )).all()
+    values = [
+        {
+            'row_id': row.id,
+            'number': _parse_number(row.location_number),
+            'position': _parse_position(row.location_position)
+        }
+        for row in rows
+    ]
+    if values:
+        bind.execute(
+            product.update()
+            .where(product.c.id == sa.bindparam('row_id'))
+            .values(
+                cabinet_number=sa.bindparam('number'),
+                cabinet_position=sa.bindparam('position')
+            ),
+            values
+        )
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_column('location_number')
+        batch_op.drop_column('location_position')
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.alter_column('cabinet_number',
+                              new_column_name='location_number')
+        batch_op.alter_column('cabinet_position',
+                              new_column_name='location_position')
+
+    _create_display_index()
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name='product')
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.alter_column(
+            'location_number', type_=sa.String(length=20),
+            postgresql_using='location_number::varchar'
+        )
+        batch_op.alter_column(
+            'location_position', type_=sa.String(length=10),
+            postgresql_using=(
+                "CASE location_position WHEN 0 THEN 'upper' "
+                "WHEN 1 THEN 'lower' END"
+            )
+        )
+    if op.get_bind().dialect.name != 'postgresql':
+        op.execute(
+            "UPDATE product SET location_position = CASE location_position "
+            "WHEN '0' THEN 'upper' WHEN '1' THEN 'lower' END"
+        )
+    op.create_index(INDEX_NAME, 'product', [
+        'lab_id', 'location_type', 'location_number',
+        'location_position', 'category', 'name'
+    ])
@@ -0,0 +1,39 @@
+"""add indexes on the sort keys of the inventory grid
+
+Revision ID: a9d2e6b4c185
+Revises: f7c1d4e9a2b3
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d2e6b4c185'
+down_revision = 'f7c1d4e9a2b3'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_product_grid_name', ['name', 'id']),
+    ('ix_product_grid_quantity', ['quantity', 'id']),
+    ('ix_product_grid_lab', ['lab_id', 'name', 'id']),
+    ('ix_product_grid_stock_level',
+     [sa.text('low_stock DESC'), 'quantity', 'id']),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'product' not in inspector.get_table_names():
+        return
+    existing = {index['name'] for index in inspector.get_indexes('product')}
+    for name, columns in INDEXES:
+        if name not in existing:
+            op.create_index(name, 'product', columns)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='product')
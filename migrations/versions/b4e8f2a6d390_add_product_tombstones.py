@@ -0,0 +1,50 @@
+"""add product tombstones and the product updated_at index
+
+Revision ID: b4e8f2a6d390
+Revises: a9d2e6b4c185
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e8f2a6d390'
+down_revision = 'a9d2e6b4c185'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    if 'product_tombstone' not in tables:
+        op.create_table(
+            'product_tombstone',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('product_id', sa.Integer(), nullable=False),
+            sa.Column('lab_id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=200), nullable=False),
+            sa.Column('registry_number', sa.String(length=50),
+                      nullable=False),
+            sa.Column('deleted_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['lab_id'], ['lab.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(
+            'ix_product_tombstone_deleted_at', 'product_tombstone',
+            ['deleted_at']
+        )
+    if 'product' in tables and 'ix_product_updated_at' not in {
+        index['name'] for index in inspector.get_indexes('product')
+    }:
+        op.create_index('ix_product_updated_at', 'product', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_product_updated_at', table_name='product')
+    op.drop_index(
+        'ix_product_tombstone_deleted_at', table_name='product_tombstone'
+    )
+    op.drop_table('product_tombstone')
@@ -0,0 +1,33 @@
+"""add lab inventory revision
+
+Revision ID: c2d7e9a41b58
+Revises: 8a4e6c1f2d93
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d7e9a41b58'
+down_revision = '8a4e6c1f2d93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'lab' not in inspector.get_table_names():
+        return
+    if 'revision' in {c['name'] for c in inspector.get_columns('lab')}:
+        return
+    with op.batch_alter_table('lab', schema=None) as batch_op:
+        batch_op.add_column(sa.Column(
+            'revision', sa.Integer(), nullable=False, server_default='0'
+        ))
+
+
+def downgrade():
+    with op.batch_alter_table('lab', schema=None) as batch_op:
+        batch_op.drop_column('revision')
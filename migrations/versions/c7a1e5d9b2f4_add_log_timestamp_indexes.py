@@ -0,0 +1,36 @@
+"""add keyset indexes of the user and transfer log exports
+
+Revision ID: c7a1e5d9b2f4
+Revises: b4e8f2a6d390
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a1e5d9b2f4'
+down_revision = 'b4e8f2a6d390'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('user_log', 'ix_user_log_timestamp_id'),
+    ('transfer_log', 'ix_transfer_log_timestamp_id'),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    for table, name in INDEXES:
+        if table in tables and name not in {
+            index['name'] for index in inspector.get_indexes(table)
+        }:
+            op.create_index(name, table, ['timestamp', 'id'])
+
+
+def downgrade():
+    for table, name in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
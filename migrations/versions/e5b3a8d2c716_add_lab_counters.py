@@ -0,0 +1,52 @@
+"""add denormalized lab product counters
+
+Revision ID: e5b3a8d2c716
+Revises: c2d7e9a41b58
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b3a8d2c716'
+down_revision = 'c2d7e9a41b58'
+branch_labels = None
+depends_on = None
+
+COUNTERS = [
+    ('product_count', sa.Integer(), 'COUNT(*)'),
+    ('total_units', sa.BigInteger(), 'COALESCE(SUM(quantity), 0)'),
+    ('low_stock_count', sa.Integer(),
+     'COALESCE(SUM(CASE WHEN quantity > 0 AND '
+     'quantity <= COALESCE(minimum_quantity, 0) THEN 1 ELSE 0 END), 0)'),
+    ('out_of_stock_count', sa.Integer(),
+     'COALESCE(SUM(CASE WHEN quantity <= 0 THEN 1 ELSE 0 END), 0)'),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'lab' not in inspector.get_table_names():
+        return
+    # The counters are only ever added together, so checking one is enough
+    if 'product_count' in {c['name'] for c in inspector.get_columns('lab')}:
+        return
+    with op.batch_alter_table('lab', schema=None) as batch_op:
+        for name, type_, _ in COUNTERS:
+            batch_op.add_column(sa.Column(
+                name, type_, nullable=False, server_default='0'
+            ))
+    if 'product' in inspector.get_table_names():
+        op.execute('UPDATE lab SET ' + ', '.join(
+            f'{name} = (SELECT {aggregate} FROM product '
+            f'WHERE product.lab_id = lab.id)'
+            for name, _, aggregate in COUNTERS
+        ))
+
+
+def downgrade():
+    with op.batch_alter_table('lab', schema=None) as batch_op:
+        for name, _, _ in reversed(COUNTERS):
+            batch_op.drop_column(name)
@@ -0,0 +1,44 @@
+"""add product low stock flag and partial index
+
+Revision ID: f7c1d4e9a2b3
+Revises: e5b3a8d2c716
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c1d4e9a2b3'
+down_revision = 'e5b3a8d2c716'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'product' not in inspector.get_table_names():
+        return
+    if 'low_stock' in {c['name'] for c in inspector.get_columns('product')}:
+        return
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.add_column(sa.Column(
+            'low_stock', sa.Boolean(), nullable=False,
+            server_default=sa.false()
+        ))
+    op.execute(
+        'UPDATE product SET low_stock = '
+        '(quantity <= COALESCE(minimum_quantity, 0))'
+    )
+    low_stock = sa.column('low_stock', sa.Boolean()).is_(True)
+    op.create_index(
+        'ix_product_low_stock', 'product', ['lab_id', 'name', 'id'],
+        sqlite_where=low_stock, postgresql_where=low_stock
+    )
+
+
+def downgrade():
+    op.drop_index('ix_product_low_stock', table_name='product')
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_column('low_stock')
@@ -0,0 +1,208 @@
+from app.extensions import db
+from app.main import dashboard_cache
+from app.main.dashboard_sections import parse_section_key, section_key
+from app.models import Product
+
+
+def _lab_code(app):
+    with app.app_context():
+        return Product.query.filter_by(
+            registry_number='TEST001'
+        ).first().lab.code
+
+
+def _add_cabinet_products(app, count):
+    with app.app_context():
+        lab_id = Product.query.first().lab_id
+        for i in range(count):
+            db.session.add(Product(
+                name=f'Resistor {i:03d}', registry_number=f'RES{i:03d}',
+                quantity=i, unit='Adet', minimum_quantity=0,
+                location_type='cabinet', location_number='2',
+                location_position='upper', lab_id=lab_id
+            ))
+        db.session.commit()
+
+
+def test_section_keys_roundtrip():
+    """Test section keys name every location and reject anything else."""
+    for location in [
+        ('workspace', None, None),
+        ('cabinet', 12, 'lower'),
+        ('cabinet', 3, None),
+    ]:
+        assert parse_section_key(section_key(*location)) == location
+    for key in ['cabinet-upper-2', 'shelf-1', 'cabinet-1-middle']:
+        try:
+            parse_section_key(key)
+        except ValueError:
+            continue
+        raise AssertionError(f'{key} was accepted')
+
+
+def test_location_sections_are_cached(app, monkeypatch):
+    """Test section counts are reused until a product of the lab changes."""
+    calls = []
+    location_sections = dashboard_cache.location_sections
+
+    def counting(lab_id):
+        calls.append(lab_id)
+        return location_sections(lab_id)
+
+    monkeypatch.setattr(dashboard_cache, 'location_sections', counting)
+    with app.app_context():
+        lab_id = Product.query.first().lab_id
+        sections = dashboard_cache.get_location_sections(lab_id)
+        assert dashboard_cache.get_location_sections(lab_id) is sections
+        assert sections == [{
+            'key': 'workspace',
+            'location_display': 'Workspace',
+            'count': 1
+        }]
+
+    _add_cabinet_products(app, 2)
+    with app.app_context():
+        sections = dashboard_cache.get_location_sections(lab_id)
+        assert calls == [lab_id, lab_id]
+        assert [s['key'] for s in sections] == ['workspace', 'cabinet-2-upper']
+        assert sections[1]['count'] == 2
+
+
+def test_dashboard_renders_section_headers(app, auth_client):
+    """Test the dashboard renders headers and loads products lazily."""
+    _add_cabinet_products(app, 3)
+    response = auth_client.get(f'/dashboard?lab={_lab_code(app)}')
+    assert response.status_code == 200
+    assert b'Cabinet 2, Position upper' in response.data
+    assert b'/sections/cabinet-2-upper' in response.data
+    assert b'RES000' not in response.data
+
+
+def test_dashboard_streams_with_one_delete_modal(app, auth_client):
+    """Test the dashboard is streamed and shares one delete modal."""
+    _add_cabinet_products(app, 3)
+    lab_code = _lab_code(app)
+    response = auth_client.get(f'/dashboard?lab={lab_code}')
+    assert response.is_streamed
+    assert response.data.count(b'class="modal fade"') == 1
+
+    section = auth_client.get(
+        f'/dashboard/{lab_code}/sections/cabinet-2-upper'
+    ).data
+    assert b'class="modal' not in section
+    assert section.count(b'data-bs-target="#deleteModal"') == 3
+    assert b'data-product-name="Resistor 001"' in section
+
+
+def test_dashboard_section_pages(app, auth_client):
+    """Test a section is paged with a keyset cursor, as HTML and JSON."""
+    _add_cabinet_products(app, 5)
+    url = f'/dashboard/{_lab_code(app)}/sections/cabinet-2-upper'
+
+    seen = []
+    after = ''
+    while True:
+        response = auth_client.get(f'{url}?format=json&limit=2&after={after}')
+        assert response.status_code == 200
+        page = response.get_json()
+        seen += [product['registry_number'] for product in page['products']]
+        if page['next'] is None:
+            break
+        after = page['next']
+    assert seen == [f'RES{i:03d}' for i in range(5)]
+
+    response = auth_client.get(f'{url}?limit=3')
+    assert b'RES002' in response.data and b'RES003' not in response.data
+    assert b'Resistor</h4>' in response.data
+    next_page = auth_client.get(
+        f"{url}?limit=3&after={response.headers['X-Next-Cursor']}"
+    )
+    assert b'RES004' in next_page.data
+    # The category continues, so its heading is not repeated
+    assert b'Resistor</h4>' not in next_page.data
+    assert 'X-Next-Cursor' not in next_page.headers
+
+    assert auth_client.get(f'{url}?after=bogus').status_code == 400
+    assert auth_client.get(
+        f'/dashboard/{_lab_code(app)}/sections/shelf-1'
+    ).status_code == 400
+
+
+def test_pages_return_304_until_the_lab_changes(app, auth_client):
+    """Test dashboard, section and search pages honour If-None-Match."""
+    lab_code = _lab_code(app)
+    for url in [
+        f'/dashboard?lab={lab_code}',
+        f'/dashboard/{lab_code}/sections/workspace',
+        f'/search?q=Test&lab={lab_code}',
+    ]:
+        response = auth_client.get(url)
+        assert response.status_code == 200 and response.data
+        etag = response.headers['ETag']
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+
+        again = auth_client.get(url, headers={'If-None-Match': etag})
+        assert again.status_code == 304
+        assert again.data == b''
+
+        _add_cabinet_products(app, 1)
+        changed = auth_client.get(url, headers={'If-None-Match': etag})
+        assert changed.status_code == 200 and changed.data
+        assert changed.headers['ETag'] != etag
+        with app.app_context():
+            Product.query.filter_by(registry_number='RES000').delete()
+            db.session.commit()
+
+
+def test_all_labs_overview_shows_counters(app, auth_client):
+    """Test the all labs dashboard shows each lab's product counters."""
+    _add_cabinet_products(app, 3)
+    response = auth_client.get('/dashboard?lab=all')
+    assert response.status_code == 200
+    # Test Product (10) and Resistors with 0, 1 and 2 units, minimum 0
+    assert b'4 products' in response.data
+    assert b'13 units' in response.data
+    assert b'low stock' not in response.data
+    assert b'1 out of stock' in response.data
+
+
+def test_streamed_dashboard_consumes_flashed_messages(auth_client):
+    """Test a message flashed before the dashboard is only shown once."""
+    auth_client.get('/dashboard?lab=NOPE')
+    response = auth_client.get('/dashboard')
+    assert b'Invalid lab code selected' in response.data
+    again = auth_client.get('/dashboard')
+    assert b'Invalid lab code selected' not in again.data
+
+
+def test_section_pages_include_products_without_category(app, auth_client):
+    """Test paging does not skip products whose category is not stored."""
+    _add_cabinet_products(app, 5)
+    with app.app_context():
+        db.session.add(Product(
+            name='Capacitor 1', registry_number='CAP001', quantity=1,
+            unit='Adet', minimum_quantity=0, location_type='cabinet',
+            location_number='2', location_position='upper',
+            lab_id=Product.query.first().lab_id
+        ))
+        db.session.commit()
+        # Not backfilled yet
+        db.session.execute(Product.__table__.update().where(
+            Product.registry_number.in_(['RES001', 'RES003'])
+        ).values(category=None))
+        db.session.commit()
+    url = f'/dashboard/{_lab_code(app)}/sections/cabinet-2-upper'
+
+    seen = []
+    after = ''
+    while True:
+        page = auth_client.get(
+            f'{url}?format=json&limit=1&after={after}'
+        ).get_json()
+        seen += [product['registry_number'] for product in page['products']]
+        if page['next'] is None:
+            break
+        after = page['next']
+    assert seen == [
+        'RES001', 'RES003', 'CAP001', 'RES000', 'RES002', 'RES004'
+    ]
@@ -0,0 +1,557 @@
+import base64
+import io
+import json
+import logging
+import re
+import threading
+import time
+import tracemalloc
+import zipfile
+import zlib
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from app.main.exports import (
+    LAB_COLUMNS, ChunkPipe,
+    encode_export_cursor, parse_export_cursor,
+    generate_excel, generate_csv, generate_ndjson, generate_pdf,
+    generate_word, generate_parquet, generate_arrow,
+    iter_export, iter_export_rows
+)
+from app.extensions import db
+from app.main import export_cache
+from app.main.jobs import shutdown_export_jobs
+from app.models import Lab, Product, TransferLog, User, UserLog
+from docx import Document
+
+
+def _rows(count):
+    for i in range(count):
+        yield (f'Resistor {i}', f'R{i:05d}', i, 'Adet', 2, 'Workspace', '')
+
+
+def test_generate_excel_streams_chunks():
+    """Test the streamed workbook round-trips through pandas."""
+    chunks = list(generate_excel(_rows(500), LAB_COLUMNS))
+    assert len(chunks) > 0
+    assert all(isinstance(chunk, bytes) for chunk in chunks)
+
+    df = pd.read_excel(io.BytesIO(b''.join(chunks)))
+    assert list(df.columns) == LAB_COLUMNS
+    assert len(df) == 500
+    assert df['Registry Number'].iloc[-1] == 'R00499'
+    assert df['Quantity'].sum() == sum(range(500))
+
+
+def test_generate_excel_continues_on_new_sheet(monkeypatch):
+    """Test rows beyond the worksheet limit go to additional sheets."""
+    monkeypatch.setattr('app.main.exports.XLSX_MAX_ROWS', 4)
+    chunks = generate_excel(_rows(7), LAB_COLUMNS, 'Log')
+    sheets = pd.read_excel(io.BytesIO(b''.join(chunks)), sheet_name=None)
+    assert list(sheets) == ['Log', 'Log (2)', 'Log (3)']
+    assert [len(df) for df in sheets.values()] == [3, 3, 1]
+
+
+def test_export_metrics_are_logged(app, caplog):
+    """Test every export logs its rows, size, time and peak memory."""
+    app.config['EXPORT_TRACE_MEMORY'] = True
+    with app.app_context(), caplog.at_level(logging.INFO):
+        data = b''.join(iter_export('csv', _rows(20), 'LAB-1'))
+
+    message = next(
+        record.getMessage() for record in caplog.records
+        if record.getMessage().startswith('Export csv (LAB-1) completed')
+    )
+    assert f'20 rows, {len(data)} bytes' in message
+    assert 'MiB' in message
+    assert not tracemalloc.is_tracing()
+
+
+def test_export_metrics_leave_existing_tracing_running(app):
+    """Test tracing started before an export is not stopped by it."""
+    app.config['EXPORT_TRACE_MEMORY'] = True
+    tracemalloc.start()
+    try:
+        with app.app_context():
+            b''.join(iter_export('csv', _rows(5), 'LAB-1'))
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_chunk_pipe_stops_producer_on_close():
+    """Test closing the stream early unblocks the writing thread."""
+    pipe = ChunkPipe(chunk_size=1, max_chunks=1)
+
+    def producer():
+        for _ in range(1000):
+            pipe.write(b'x')
+
+    stream = pipe.stream(producer)
+    assert next(stream) == b'x'
+    stream.close()
+
+
+def test_iter_export_rows(app):
+    """Test export rows are read for a single lab and for all labs."""
+    with app.app_context():
+        lab = Lab.query.first()
+        rows = list(iter_export_rows(lab))
+        assert rows[0] == (
+            'Test Product', 'TEST001', 10, 'Adet', 5, 'Workspace', ''
+        )
+
+        all_rows = list(iter_export_rows())
+        assert all_rows[0][0] == f'{lab.code} - {lab.description}'
+        assert all_rows[0][1:] == rows[0]
+
+
+def test_location_display_expression(app):
+    """Test the SQL location display matches get_location_display()."""
+    with app.app_context():
+        lab = Lab.query.first()
+        locations = [
+            ('workspace', None, None),
+            ('cabinet', '3', None),
+            ('cabinet', '3', ''),
+            ('cabinet', '4', 'upper'),
+            ('cabinet', None, 'lower'),
+        ]
+        for i, (location_type, number, position) in enumerate(locations):
+            db.session.add(Product(
+                name=f'Location {i}', registry_number=f'LOC{i}',
+                quantity=1, unit='Adet', lab_id=lab.id,
+                location_type=location_type, location_number=number,
+                location_position=position
+            ))
+        db.session.commit()
+
+        products = Product.query.filter(Product.name.like('Location %'))
+        displayed = db.session.query(
+            Product.id, Product.location_display_expression()
+        ).filter(Product.name.like('Location %'))
+        expected = {p.id: p.get_location_display() for p in products}
+        assert dict(displayed.all()) == expected
+
+
+def test_generate_csv_and_ndjson(app):
+    """Test CSV and NDJSON exports yield one chunk per row batch."""
+    app.config['EXPORT_BATCH_SIZE'] = 100
+    with app.app_context():
+        chunks = list(generate_csv(_rows(250), LAB_COLUMNS))
+        assert len(chunks) == 4  # header + 3 batches
+        text = b''.join(chunks).decode('utf-8')
+        assert text.splitlines()[0] == ','.join(LAB_COLUMNS)
+        assert len(text.splitlines()) == 251
+
+        chunks = list(generate_ndjson(_rows(250), LAB_COLUMNS))
+        assert len(chunks) == 3
+        lines = b''.join(chunks).decode('utf-8').splitlines()
+        assert json.loads(lines[-1])['Registry Number'] == 'R00249'
+
+
+def test_generate_parquet_and_arrow(app, monkeypatch):
+    """Test columnar exports keep integer columns typed."""
+    monkeypatch.setattr('app.main.exports.PARQUET_ROW_GROUP_ROWS', 100)
+    with app.app_context():
+        chunks = list(generate_parquet(_rows(250), LAB_COLUMNS))
+        parquet = pq.ParquetFile(io.BytesIO(b''.join(chunks)))
+        assert parquet.num_row_groups == 3
+        table = parquet.read()
+        assert table.column_names == LAB_COLUMNS
+        assert table.schema.field('Quantity').type == pa.int32()
+        assert table.column('Quantity').to_pylist() == list(range(250))
+
+        chunks = generate_arrow(_rows(250), LAB_COLUMNS)
+        table = pa.ipc.open_stream(b''.join(chunks)).read_all()
+        assert table.schema.field('Minimum Quantity').type == pa.int32()
+        assert table.column('Registry Number')[-1].as_py() == 'R00249'
+
+
+def test_export_lab_streaming_formats(app, auth_client, tmp_path):
+    """Test CSV and NDJSON export routes."""
+    app.config['EXPORT_CACHE_DIR'] = str(tmp_path)
+    response = auth_client.get('/export/1/csv')
+    assert response.status_code == 200
+    assert 'text/csv' in response.headers['Content-Type']
+    assert b'TEST001' in response.data
+
+    response = auth_client.get('/export/all/ndjson')
+    assert response.status_code == 200
+    assert 'attachment' in response.headers['Content-Disposition']
+    assert json.loads(response.data.splitlines()[0])['Name'] == 'Test Product'
+
+    response = auth_client.get('/export/all/parquet')
+    table = pq.read_table(io.BytesIO(response.data))
+    assert table.column('Registry Number').to_pylist() == ['TEST001']
+
+
+def test_generate_pdf_paginates_lazily():
+    """Test PDF rows are split into pages and sections per lab."""
+    def lab_rows():
+        for i, row in enumerate(_rows(120)):
+            yield (f'{i % 2 + 1} - Lab',) + row
+
+    # Rows are consumed from the iterator rather than a prebuilt list
+    pdf = generate_pdf(_rows(120), 'LAB-1').read()
+    assert pdf.startswith(b'%PDF')
+    assert pdf.count(b'/Type /Page\n') >= 3
+
+    rows = sorted(lab_rows(), key=lambda row: row[0])
+    pdf = generate_pdf(iter(rows)).read()
+    assert pdf.count(b'/Type /Page\n') >= 4
+
+
+def _pdf_page_contents(pdf):
+    streams = re.findall(
+        rb'/Filter \[ /ASCII85Decode /FlateDecode \] /Length \d+\s*>>\s*'
+        rb'stream\r?\n(.*?)endstream', pdf, re.S
+    )
+    return [
+        zlib.decompress(base64.a85decode(stream.strip(), adobe=True))
+        for stream in streams
+    ]
+
+
+def test_generate_pdf_one_header_per_page():
+    """Test every page holds a single table under a single header row."""
+    rows = list(_rows(400))
+    rows[5] = rows[5][:-1] + ('line 1\nline 2\nline 3',)
+    pdf = generate_pdf(iter(rows), 'LAB-1').read()
+
+    pages = _pdf_page_contents(pdf)
+    assert len(pages) == pdf.count(b'/Type /Page\n') > 1
+    assert [page.count(b'(Min Qty)') for page in pages] == [1] * len(pages)
+    assert sum(page.count(b'(Adet)') for page in pages) == 400
+
+
+def test_generate_word_bulk_rows():
+    """Test bulk-written Word rows read back like python-docx cells."""
+    rows = [('1 - Lab',) + row for row in _rows(1200)]
+    rows[3] = rows[3][:-1] + ('line 1\nline 2 <&>',)
+
+    table = Document(generate_word(iter(rows))).tables[0]
+    assert table.style.name == 'Table Grid'
+    assert len(table.rows) == 1201
+    assert [cell.text for cell in table.rows[4].cells] == [
+        '1 - Lab', 'Resistor 3', 'R00003', '3', 'Adet', '2',
+        'Workspace', 'line 1\nline 2 <&>'
+    ]
+
+
+def test_export_job_lifecycle(app, auth_client, tmp_path):
+    """Test submitting, polling and downloading a background export."""
+    app.config['EXPORT_JOB_DIR'] = str(tmp_path)
+    app.config['EXPORT_JOB_WORKERS'] = 1
+    try:
+        response = auth_client.post('/export/jobs', data={
+            'lab': '1',
+            'format': 'csv'
+        })
+        assert response.status_code == 202
+        job = response.json
+        assert job['status'] in ('queued', 'running')
+
+        deadline = time.time() + 60
+        while job['status'] not in ('finished', 'failed'):
+            assert time.time() < deadline
+            time.sleep(0.2)
+            job = auth_client.get(job['status_url']).json
+
+        assert job['status'] == 'finished'
+        assert job['rows_processed'] == 1
+        response = auth_client.get(job['download_url'])
+        assert response.status_code == 200
+        assert 'attachment' in response.headers['Content-Disposition']
+        assert b'TEST001' in response.data
+
+        response = auth_client.post('/export/jobs', data={'format': 'zip'})
+        assert response.status_code == 400
+        assert auth_client.get('/export/jobs/unknown').status_code == 404
+    finally:
+        shutdown_export_jobs()
+
+
+def test_export_cache_reuses_and_invalidates(app, auth_client, tmp_path):
+    """Test repeat exports are served from cache until a product changes."""
+    app.config['EXPORT_CACHE_DIR'] = str(tmp_path)
+
+    first = auth_client.get('/export/1/pdf').data
+    cached = list(tmp_path.iterdir())
+    assert len(cached) == 1
+    assert cached[0].name.startswith('lab-1.')
+
+    assert auth_client.get('/export/1/pdf').data == first
+
+    with app.app_context():
+        product = Product.query.filter_by(registry_number='TEST001').first()
+        product.quantity = 42
+        db.session.commit()
+    assert list(tmp_path.iterdir()) == []
+
+    response = auth_client.get('/export/1/csv')
+    assert b',42,' in response.data
+
+
+def test_export_bundle_streams_zip(app, auth_client, tmp_path):
+    """Test the bundle export renders every lab and format into a ZIP."""
+    app.config['EXPORT_JOB_DIR'] = str(tmp_path)
+    app.config['EXPORT_JOB_WORKERS'] = 2
+    try:
+        response = auth_client.get('/export/bundle?formats=csv,pdf')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/zip'
+
+        archive = zipfile.ZipFile(io.BytesIO(response.data))
+        with app.app_context():
+            lab_codes = [lab.code for lab in Lab.query.all()]
+        names = archive.namelist()
+        assert len(names) == len(lab_codes) * 2
+        assert {name.split('/')[0] for name in names} == set(lab_codes)
+
+        csv_name = next(
+            name for name in names
+            if name.startswith('1/') and name.endswith('.csv')
+        )
+        assert b'TEST001' in archive.read(csv_name)
+        assert not any(path.name.startswith('bundle-')
+                       for path in tmp_path.iterdir())
+
+        response = auth_client.get('/export/bundle?formats=zip')
+        assert response.status_code == 400
+    finally:
+        shutdown_export_jobs()
+
+
+def test_export_cursor_roundtrip():
+    """Test revision tokens and ISO timestamps are both accepted."""
+    timestamp = datetime(2024, 5, 1, 12, 30, 15, 250000)
+    assert parse_export_cursor(encode_export_cursor(timestamp)) == timestamp
+    assert parse_export_cursor('2024-05-01T12:30:15.250000') == timestamp
+    assert parse_export_cursor('2024-05-01T15:30:15.25+03:00') == timestamp
+
+
+def test_delta_export(app, auth_client, tmp_path):
+    """Test a delta export holds only later changes plus tombstones."""
+    app.config['EXPORT_CACHE_DIR'] = str(tmp_path)
+    app.config['EXPORT_DELTA_OVERLAP'] = 0
+    with app.app_context():
+        db.session.add(Product(
+            name='Capacitor', registry_number='CAP001', quantity=3,
+            unit='Adet', location_type='workspace', lab_id=1
+        ))
+        db.session.commit()
+
+    cursor = auth_client.get('/export/1/ndjson').headers['X-Export-Cursor']
+    response = auth_client.get(f'/export/1/ndjson?since={cursor}')
+    assert response.status_code == 200
+    assert response.data == b''
+
+    with app.app_context():
+        product = Product.query.filter_by(registry_number='TEST001').first()
+        product.quantity = 7
+        db.session.delete(
+            Product.query.filter_by(registry_number='CAP001').first()
+        )
+        db.session.commit()
+
+    response = auth_client.get(f'/export/1/ndjson?since={cursor}')
+    changes = [json.loads(line) for line in response.data.splitlines()]
+    assert {c['Registry Number']: c['Change'] for c in changes} == {
+        'TEST001': 'upsert',
+        'CAP001': 'delete'
+    }
+    upsert = next(c for c in changes if c['Change'] == 'upsert')
+    assert upsert['Quantity'] == 7
+    assert upsert['Changed At']
+    assert response.headers['X-Export-Cursor'] != cursor
+
+    response = auth_client.get(f'/export/all/csv?since={cursor}')
+    header = response.data.decode('utf-8').splitlines()[0]
+    assert header.startswith('Change,Lab,Name')
+
+    assert auth_client.get(
+        f'/export/1/pdf?since={cursor}'
+    ).status_code == 400
+    assert auth_client.get('/export/1/csv?since=yesterday').status_code == 400
+
+
+def _add_logs():
+    admin = User.query.filter_by(username='admin').first()
+    editor = User.query.filter_by(username='editor').first()
+    product = Product.query.first()
+    for day, user, action in [
+        (1, admin, 'add'), (1, admin, 'edit'), (1, editor, 'edit'),
+        (2, editor, 'delete'), (3, admin, 'transfer')
+    ]:
+        db.session.add(UserLog(
+            user_id=user.id, action_type=action, product_id=product.id,
+            lab_id=product.lab_id, quantity=1,
+            timestamp=datetime(2024, 3, day, 9, 0)
+        ))
+    db.session.add(TransferLog(
+        quantity=2, timestamp=datetime(2024, 3, 2, 10, 0),
+        product_id=product.id, source_lab_id=product.lab_id,
+        destination_lab_id=product.lab_id, created_by_id=admin.id
+    ))
+    db.session.commit()
+
+
+def test_export_user_logs(app, auth_client):
+    """Test log exports are filtered and read in keyset batches."""
+    app.config['EXPORT_BATCH_SIZE'] = 2
+    with app.app_context():
+        _add_logs()
+
+    response = auth_client.get('/logs/export/csv?start=2024-03-01')
+    assert response.status_code == 200
+    lines = response.data.decode('utf-8').splitlines()
+    assert lines[0] == 'Timestamp,User,Action,Lab,Product,' \
+        'Registry Number,Quantity,Notes'
+    assert len(lines) == 6
+    assert lines[1].startswith('2024-03-01 09:00:00,admin,add,')
+    assert 'Test Product,TEST001' in lines[1]
+
+    response = auth_client.get(
+        '/logs/export/csv?start=2024-03-01&end=2024-03-02&user=editor'
+    )
+    actions = [
+        line.split(',')[2]
+        for line in response.data.decode('utf-8').splitlines()[1:]
+    ]
+    assert actions == ['edit', 'delete']
+
+    response = auth_client.get('/logs/export/xlsx?action=edit')
+    df = pd.read_excel(io.BytesIO(response.data))
+    assert list(df['User']) == ['admin', 'editor']
+
+    response = auth_client.get('/logs/transfers/export/csv?lab=1')
+    lines = response.data.decode('utf-8').splitlines()
+    assert len(lines) == 2
+    assert lines[1].startswith('2024-03-02 10:00:00,admin,Test Product')
+
+    assert auth_client.get('/logs/export/pdf').status_code == 400
+    assert auth_client.get('/logs/export/csv?start=March').status_code == 400
+
+
+def test_spooled_export_supports_range_and_etag(app, auth_client, tmp_path):
+    """Test PDF exports can be resumed with Range and revalidated."""
+    app.config['EXPORT_CACHE_DIR'] = str(tmp_path)
+    app.config['EXPORT_SPOOL_MAX_MEMORY'] = 1024
+
+    # Without the cache every request renders a new file, so ranges
+    # are refused and the whole file is sent
+    app.config['EXPORT_CACHE_ENABLED'] = False
+    full = auth_client.get('/export/1/pdf')
+    assert full.status_code == 200
+    assert full.headers['Accept-Ranges'] == 'none'
+    partial = auth_client.get('/export/1/pdf', headers={
+        'Range': 'bytes=100-',
+        'If-Range': full.headers['ETag']
+    })
+    assert partial.status_code == 200
+    assert partial.data.startswith(b'%PDF')
+    assert int(partial.headers['Content-Length']) == len(partial.data)
+
+    app.config['EXPORT_CACHE_ENABLED'] = True
+    full = auth_client.get('/export/1/pdf')
+    assert full.status_code == 200
+    assert full.headers['Accept-Ranges'] == 'bytes'
+    assert int(full.headers['Content-Length']) == len(full.data)
+    etag = full.headers['ETag']
+
+    partial = auth_client.get('/export/1/pdf', headers={
+        'Range': 'bytes=100-',
+        'If-Range': etag
+    })
+    assert partial.status_code == 206
+    assert partial.data == full.data[100:]
+
+    # Once the inventory changes the old ETag no longer matches and the
+    # whole new file is sent instead of a range of it
+    with app.app_context():
+        product = Product.query.filter_by(lab_id=1).first()
+        product.quantity += 1
+        db.session.commit()
+    stale = auth_client.get('/export/1/pdf', headers={
+        'Range': 'bytes=100-',
+        'If-Range': etag
+    })
+    assert stale.status_code == 200
+    assert stale.headers['ETag'] != etag
+    assert int(stale.headers['Content-Length']) == len(stale.data)
+
+    cached = auth_client.get('/export/1/pdf')
+    assert auth_client.get('/export/1/pdf', headers={
+        'If-None-Match': cached.headers['ETag']
+    }).status_code == 304
+
+
+def test_identical_exports_are_coalesced(app, tmp_path, monkeypatch):
+    """Test concurrent identical exports are generated only once."""
+    app.config['EXPORT_CACHE_DIR'] = str(tmp_path)
+    claims = []
+    generated = []
+    claim = export_cache.claim
+
+    def counting_claim(path):
+        claims.append(path)
+        return claim(path)
+
+    def slow_export(*args, **kwargs):
+        # Keep the first export in flight until every request missed
+        # the cache and joined it
+        generated.append(args[0])
+        deadline = time.time() + 10
+        while len(claims) < 4 and time.time() < deadline:
+            time.sleep(0.05)
+        yield from iter_export(*args, **kwargs)
+
+    monkeypatch.setattr(export_cache, 'claim', counting_claim)
+    monkeypatch.setattr('app.main.routes.iter_export', slow_export)
+
+    bodies = []
+
+    def download():
+        client = app.test_client()
+        client.post('/auth/login', data={
+            'username': 'admin',
+            'password': 'admin'
+        })
+        bodies.append(client.get('/export/all/csv').data)
+
+    threads = [threading.Thread(target=download) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claims) == 4
+    assert generated == ['csv']
+    assert len(bodies) == 4
+    assert len(set(bodies)) == 1
+
+
+def test_cached_export_returns_304(app, auth_client, tmp_path):
+    """Test a cached export is revalidated against the lab revision."""
+    app.config['EXPORT_CACHE_DIR'] = str(tmp_path)
+    auth_client.get('/export/1/csv').data
+    response = auth_client.get('/export/1/csv')
+    etag = response.headers['ETag'].strip('"')
+    with app.app_context():
+        revision = db.session.get(Lab, 1).revision
+    assert etag.startswith(f'r{revision}-')
+
+    again = auth_client.get(
+        '/export/1/csv', headers={'If-None-Match': f'"{etag}"'}
+    )
+    assert again.status_code == 304
+
+    with app.app_context():
+        Product.query.filter_by(registry_number='TEST001').first().quantity = 7
+        db.session.commit()
+    changed = auth_client.get(
+        '/export/1/csv', headers={'If-None-Match': f'"{etag}"'}
+    )
+    assert changed.status_code == 200 and b',7,' in changed.data
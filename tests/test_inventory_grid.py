@@ -0,0 +1,104 @@
+from app.extensions import db
+from app.models import Lab, Product
+
+
+def _add_products(app):
+    """Add products with duplicate names and quantities to two labs."""
+    with app.app_context():
+        first = Product.query.first().lab_id
+        other = Lab.query.filter(Lab.id != first).first().id
+        for i in range(12):
+            db.session.add(Product(
+                name=f'Cable {i % 4}', registry_number=f'CAB{i:02d}',
+                quantity=i % 5, unit='Kutu' if i % 3 else 'Adet',
+                minimum_quantity=2, location_type='workspace',
+                lab_id=first if i % 2 else other
+            ))
+        db.session.commit()
+        return other
+
+
+def _all_pages(client, query):
+    products = []
+    after = ''
+    while True:
+        response = client.get(
+            f'/inventory/grid?{query}&limit=5&after={after}'
+        )
+        assert response.status_code == 200
+        page = response.get_json()
+        products += page['products']
+        if page['next'] is None:
+            return products, page['total']
+        after = page['next']
+
+
+def test_grid_sorts_every_key_both_ways(app, auth_client):
+    """Test seek pages match a full sort for every key and direction."""
+    _add_products(app)
+    keys = {
+        'name': lambda p: (p['name'], p['id']),
+        'registry_number': lambda p: (p['registry_number'], p['id']),
+        'quantity': lambda p: (p['quantity'], p['id']),
+        'lab': lambda p: (p['lab_id'], p['name'], p['id']),
+        'stock_level': lambda p: (
+            p['stock_level'] == 'ok', p['quantity'], p['id']
+        ),
+    }
+    for sort, key in keys.items():
+        for direction in ('asc', 'desc'):
+            products, total = _all_pages(
+                auth_client, f'sort={sort}&dir={direction}'
+            )
+            assert total == 13
+            assert products == sorted(
+                products, key=key, reverse=direction == 'desc'
+            )
+            assert len({p['id'] for p in products}) == 13
+
+
+def test_grid_filters(app, auth_client):
+    """Test the lab, unit and stock filters and their totals."""
+    other = _add_products(app)
+    with app.app_context():
+        other_code = db.session.get(Lab, other).code
+
+    products, total = _all_pages(auth_client, f'lab={other_code}')
+    assert total == 6 and len(products) == 6
+    assert {p['lab_code'] for p in products} == {other_code}
+
+    products, total = _all_pages(auth_client, 'stock=out&sort=quantity')
+    assert total == len(products) == 3
+    assert {p['stock_level'] for p in products} == {'out'}
+
+    products, total = _all_pages(auth_client, 'stock=low')
+    assert total == len(products) == 5
+
+    # Counts by unit are not kept
+    products, total = _all_pages(auth_client, 'unit=Adet')
+    assert total is None
+    assert len(products) == 5
+
+
+def test_grid_rejects_bad_arguments(app, auth_client):
+    """Test invalid sorts, filters and foreign cursors are rejected."""
+    _add_products(app)
+    assert auth_client.get('/inventory/grid?sort=notes').status_code == 400
+    assert auth_client.get('/inventory/grid?dir=up').status_code == 400
+    assert auth_client.get('/inventory/grid?stock=some').status_code == 400
+    assert auth_client.get('/inventory/grid?lab=NOPE').status_code == 404
+
+    cursor = auth_client.get(
+        '/inventory/grid?sort=name&limit=2'
+    ).get_json()['next']
+    assert auth_client.get(
+        f'/inventory/grid?sort=quantity&after={cursor}'
+    ).status_code == 400
+
+
+def test_all_labs_dashboard_has_grid(auth_client):
+    """Test the all labs dashboard renders the grid and its script."""
+    response = auth_client.get('/dashboard?lab=all')
+    assert b'id="inventoryGrid"' in response.data
+    assert b'/inventory/grid' in response.data
+    assert b'js/inventory_grid.js' in response.data
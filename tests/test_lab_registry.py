@@ -0,0 +1,64 @@
+from sqlalchemy import event
+
+from app.extensions import db
+from app.main import lab_registry
+from app.main.forms import ProductForm, TransferForm
+from app.models import Lab
+
+
+def _count_queries(app):
+    statements = []
+    with app.app_context():
+        engine = db.engine
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_execute)
+    return statements
+
+
+def test_lookups_are_served_from_memory(app):
+    """Test lab lookups and choices run no queries once loaded."""
+    with app.app_context():
+        lab_registry.all_labs()
+        statements = _count_queries(app)
+
+        lab = lab_registry.get_by_code('TEST-LAB')
+        assert lab_registry.get(lab.id) is lab
+        assert lab.name == 'Test Laboratory'
+        assert (lab.id, 'TEST-LAB - Test Laboratory') in lab_registry.choices()
+        assert lab.id not in dict(lab_registry.choices(exclude_id=lab.id))
+        assert [l.code for l in lab_registry.all_labs()] == sorted(
+            l.code for l in lab_registry.all_labs()
+        )
+        assert lab_registry.get_by_code('missing') is None
+        assert statements == []
+
+
+def test_registry_reloads_after_lab_commit(app):
+    """Test the registry picks up committed lab changes."""
+    with app.app_context():
+        assert lab_registry.get_by_code('NEW') is None
+        db.session.add(Lab(code='NEW', name='New Lab', max_cabinets=2))
+        db.session.commit()
+        assert lab_registry.get_by_code('NEW').max_cabinets == 2
+
+        Lab.query.filter_by(code='NEW').first().name = 'Renamed Lab'
+        db.session.commit()
+        assert lab_registry.get_by_code('NEW').name == 'Renamed Lab'
+
+
+def test_forms_do_not_seed_or_query_labs(app):
+    """Test building forms neither commits nor queries labs."""
+    with app.test_request_context(method='POST'):
+        lab = lab_registry.get_by_code('TEST-LAB')
+        statements = _count_queries(app)
+
+        form = ProductForm(lab_id=lab.id)
+        assert (lab.id, 'TEST-LAB - Test Laboratory') in form.lab_id.choices
+        assert len(form.location.choices) == 1 + 2 * lab.max_cabinets
+
+        form = TransferForm(source_lab_id=lab.id)
+        assert lab.id not in dict(form.destination_lab_id.choices)
+        assert statements == []
@@ -0,0 +1,96 @@
+from app.extensions import db
+from app.models import Lab, Product
+
+
+def _add_products(app, lab_id, quantities, minimum=5):
+    with app.app_context():
+        for i, quantity in enumerate(quantities):
+            db.session.add(Product(
+                name=f'Fuse {lab_id}-{i:02d}', registry_number=f'FUSE{i:02d}',
+                quantity=quantity, unit='Adet', minimum_quantity=minimum,
+                location_type='workspace', lab_id=lab_id
+            ))
+        db.session.commit()
+
+
+def test_low_stock_flag_follows_writes(app):
+    """Test the low stock flag is set at or below the minimum quantity."""
+    with app.app_context():
+        product = Product.query.first()
+        assert product.low_stock is False
+
+        product.quantity = 5
+        db.session.commit()
+        assert Product.query.first().low_stock is True
+
+        product.minimum_quantity = 2
+        db.session.commit()
+        assert Product.query.first().low_stock is False
+
+        product.quantity = 0
+        product.minimum_quantity = 0
+        db.session.commit()
+        assert Product.query.first().low_stock is True
+
+
+def test_low_stock_pages_across_labs(app, auth_client):
+    """Test the JSON listing pages through every lab and filters by lab."""
+    with app.app_context():
+        first = Product.query.first().lab
+        other = Lab.query.filter(Lab.id != first.id).first()
+        first_id, other_id = first.id, other.id
+        other_code = other.code
+    _add_products(app, first_id, [0, 3, 9])
+    _add_products(app, other_id, [1, 5])
+
+    seen = []
+    after = ''
+    while True:
+        response = auth_client.get(
+            f'/low-stock?format=json&limit=2&after={after}'
+        )
+        assert response.status_code == 200
+        page = response.get_json()
+        seen += [(p['lab_id'], p['name'], p['stock_level'])
+                 for p in page['products']]
+        if page['next'] is None:
+            break
+        after = page['next']
+    assert seen == sorted([
+        (first_id, f'Fuse {first_id}-00', 'out'),
+        (first_id, f'Fuse {first_id}-01', 'low'),
+        (other_id, f'Fuse {other_id}-00', 'low'),
+        (other_id, f'Fuse {other_id}-01', 'low'),
+    ])
+
+    page = auth_client.get(f'/low-stock?format=json&lab={other_code}')
+    assert page.get_json()['lab'] == other_code
+    assert len(page.get_json()['products']) == 2
+
+    response = auth_client.get(f'/low-stock?lab={other_code}')
+    assert response.status_code == 200
+    assert f'Fuse {other_id}-01'.encode() in response.data
+    assert f'Fuse {first_id}-00'.encode() not in response.data
+
+    assert auth_client.get('/low-stock?after=bogus').status_code == 400
+    assert auth_client.get('/low-stock?lab=NOPE').status_code == 404
+
+
+def test_low_stock_returns_304_until_stock_changes(app, auth_client):
+    """Test polling the listing is answered with 304 while unchanged."""
+    response = auth_client.get('/low-stock?format=json')
+    etag = response.headers['ETag']
+    again = auth_client.get(
+        '/low-stock?format=json', headers={'If-None-Match': etag}
+    )
+    assert again.status_code == 304
+
+    with app.app_context():
+        Product.query.first().quantity = 1
+        db.session.commit()
+    changed = auth_client.get(
+        '/low-stock?format=json', headers={'If-None-Match': etag}
+    )
+    assert changed.status_code == 200
+    assert [p['registry_number'] for p in changed.get_json()['products']] \
+        == ['TEST001']
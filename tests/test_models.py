@@ -1,6 +1,8 @@
 import pytest
 from app.models import Product, Lab, User, TransferLog, UserLog
+from app.models.product import ProductRecord
 from app.extensions import db
+from app.main.dashboard_sections import location_sections
 
 def test_product_validation(app):
     with app.app_context():
@@ -135,4 +137,155 @@ def test_product_location_display(app):
             location_position="upper",
             lab_id=1
         )
-        assert cabinet_product.get_location_display() == "Dolap No: 1 - Üst"
\ No newline at end of file
+        assert cabinet_product.get_location_display() == "Dolap No: 1 - Üst"
+
+def test_product_category_is_stored(app):
+    with app.app_context():
+        product = Product.query.first()
+        assert product.category == 'Test'
+
+        product.name = 'resistor 10k'
+        assert product.category == 'Resistor'
+
+        product.name = 'Multimeter'
+        db.session.commit()
+        assert db.session.get(Product, product.id).category == 'Uncategorized'
+
+def test_backfill_categories_command(app, runner):
+    with app.app_context():
+        db.session.execute(
+            Product.__table__.update().values(category=None)
+        )
+        db.session.commit()
+        version_id = Product.query.first().version_id
+
+    result = runner.invoke(args=['backfill-categories', '--batch-size', '1'])
+    assert 'Categories backfilled for 1 products' in result.output
+
+    with app.app_context():
+        product = Product.query.first()
+        assert product.category == 'Test'
+        assert product.version_id == version_id
+
+def test_sorted_products_use_numeric_cabinet_order(app):
+    with app.app_context():
+        lab_id = Product.query.first().lab_id
+        for i, (number, position) in enumerate(
+            [('10', 'upper'), ('2', 'lower'), ('2', 'upper')]
+        ):
+            db.session.add(Product(
+                name=f'Cabinet Item {i}', registry_number=f'CAB{i}',
+                quantity=1, unit='Adet', minimum_quantity=0,
+                location_type='cabinet', location_number=number,
+                location_position=position, lab_id=lab_id
+            ))
+        db.session.commit()
+
+        assert [section['key'] for section in location_sections(lab_id)] == [
+            'workspace', 'cabinet-2-upper', 'cabinet-2-lower',
+            'cabinet-10-upper'
+        ]
+
+        with pytest.raises(ValueError):
+            Product.query.first().location_position = 'middle'
+        with pytest.raises(ValueError):
+            Product.query.first().location_number = 'A'
+
+def test_lab_revision_follows_product_writes(app):
+    with app.app_context():
+        product = Product.query.first()
+        lab = product.lab
+        other = Lab.query.filter(Lab.id != lab.id).first()
+        start, other_start = lab.revision, other.revision
+
+        product.quantity += 1
+        db.session.commit()
+        db.session.refresh(lab)
+        assert lab.revision == start + 1
+
+        product.quantity += 1
+        db.session.flush()
+        db.session.rollback()
+        db.session.refresh(lab)
+        assert lab.revision == start + 1
+
+        # A move changes both labs
+        product.lab_id = other.id
+        db.session.commit()
+        db.session.refresh(lab)
+        db.session.refresh(other)
+        assert (lab.revision, other.revision) == (start + 2, other_start + 1)
+
+def _counters(lab):
+    db.session.refresh(lab)
+    return (lab.product_count, lab.total_units,
+            lab.low_stock_count, lab.out_of_stock_count)
+
+def test_lab_counters_follow_product_writes(app):
+    with app.app_context():
+        product = Product.query.first()
+        lab = product.lab
+        other = Lab.query.filter(Lab.id != lab.id).first()
+        assert _counters(lab) == (1, 10, 0, 0)
+
+        db.session.add(Product(
+            name='Empty Box', registry_number='EMPTY1', quantity=0,
+            unit='Adet', minimum_quantity=1, location_type='workspace',
+            lab_id=lab.id
+        ))
+        product.quantity = 5
+        db.session.commit()
+        assert _counters(lab) == (2, 5, 1, 1)
+
+        product.lab_id = other.id
+        db.session.commit()
+        assert _counters(lab) == (1, 0, 0, 1)
+        assert _counters(other) == (1, 5, 1, 0)
+
+        db.session.delete(Product.query.filter_by(
+            registry_number='EMPTY1'
+        ).first())
+        db.session.commit()
+        assert _counters(lab) == (0, 0, 0, 0)
+
+def test_recompute_lab_counters_command(app, runner):
+    with app.app_context():
+        lab = Product.query.first().lab
+        db.session.execute(
+            Lab.__table__.update().values(product_count=7, total_units=-3)
+        )
+        db.session.commit()
+        revision = lab.revision
+
+    result = runner.invoke(args=['recompute-lab-counters'])
+    assert 'Counters recomputed' in result.output
+
+    with app.app_context():
+        lab = Product.query.first().lab
+        assert _counters(lab) == (1, 10, 0, 0)
+        assert lab.revision == revision + 1
+        assert all(other.product_count == 0 for other in
+                   Lab.query.filter(Lab.id != lab.id))
+
+def test_list_views_read_product_records(app):
+    with app.app_context():
+        lab = Product.query.first().lab
+        lab_id, lab_code = lab.id, lab.code
+        db.session.expunge_all()
+
+        results = Product.search('test')
+        assert results.total == 1
+        record = results.items[0]
+        assert isinstance(record, ProductRecord)
+        assert (record.lab_code, record.location_display,
+                record.stock_level) == (lab_code, 'Workspace', 'ok')
+
+        records = [
+            ProductRecord._make(row) for row in db.session.execute(
+                Product.record_select().where(Product.lab_id == lab_id)
+                .order_by(*Product.display_order())
+            )
+        ]
+        assert records == [record]
+        # Nothing was loaded into the session
+        assert len(db.session.identity_map) == 0